@@ -0,0 +1,260 @@
+import json
+import re
+from argparse import ArgumentParser, Namespace
+from datetime import datetime
+from os import makedirs, path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter
+from components.browser import Browser
+from components.database import Database
+from components.fetcher import Fetcher
+from components.instrumentation import instrumentation, python_peak_kb
+from components.batter import Batter
+from components.schedule_provider import StatsApiScheduleProvider, get_next_games, get_last_games
+from components.table_parser import parse_table
+from components.team_directory import TeamDirectory
+from scrapers.games_today_scraper import GamesTodayScraper
+from scrapers.teams_scraper import TeamsScraper
+from scrapers.stats_scraper import StatsScraper
+
+BENCHMARK_DIR = "benchmarks"
+HAR_PATH = f"{BENCHMARK_DIR}/pages.har"
+META_PATH = f"{BENCHMARK_DIR}/meta.json"
+BASELINE_PATH = f"{BENCHMARK_DIR}/baseline.json"
+PAGE_STAGES = ["open_url", "wait selector", "wait table", "wait sort", "wait network", "extract_rows"]
+# The HTTP backend replays small saved pages, they are committed unlike the recorded HAR
+FIXTURES_DIR = f"{BENCHMARK_DIR}/fixtures"
+FIXTURE_DAY = datetime(2022, 9, 1)
+FIXTURE_URLS = [
+    (r"statsapi\.mlb\.com/api/v1/schedule", "schedule.json"),
+    (r"/teams/NYY/2022\.shtml", "team_NYY.html"),
+    (r"/teams/BOS/2022\.shtml", "team_BOS.html"),
+    (r"/players/gl\.fcgi", "gamelog.html"),
+]
+HTTP_STAGES = ["schedule", "fetch", "parse_table"]
+
+
+class FixtureAdapter(BaseAdapter):
+    """Transport adapter that answers the requests of a session with the saved fixture of their
+    url, like `route_from_har` does for the browser. Urls without a fixture get a 404."""
+    _pages: dict
+
+    def __init__(self):
+        super().__init__()
+        self._pages = {}
+        for pattern, file_name in FIXTURE_URLS:
+            with open(path.join(FIXTURES_DIR, file_name), "rb") as file:
+                self._pages[pattern] = file.read()
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        response = Response()
+        response.request = request
+        response.url = request.url
+        response.encoding = "UTF-8"
+        response.status_code = 404
+        response._content = b""
+        for pattern, content in self._pages.items():
+            if re.search(pattern, request.url):
+                response.status_code = 200
+                response._content = content
+                break
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def parse_args() -> Namespace:
+    """Parses the command line arguments."""
+    parser = ArgumentParser(description="Runs the scrapers end to end on recorded pages, without the network.")
+    parser.add_argument("--record", action="store_true",
+                        help=f"scrape the live sites and record the pages to {HAR_PATH}")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"save the results of the replay as the baseline in {BASELINE_PATH}")
+    parser.add_argument("--teams", type=int, default=2, help="the number of teams to scrape, default 2")
+    parser.add_argument("--batters", type=int, default=3, help="the number of batters per team, default 3")
+    parser.add_argument("--pages", type=int, default=3, help="the number of pages open at once, default 3")
+    parser.add_argument("--lean", action="store_true", help="run the lean browser")
+    parser.add_argument("--http", action="store_true",
+                        help=f"replay the pages in {FIXTURES_DIR} through the HTTP backend and the stats api schedule")
+    parser.add_argument("--check", action="store_true",
+                        help=f"only check that the HTTP backend parses the pages in {FIXTURES_DIR} as expected")
+    parser.add_argument("--rounds", type=int, default=20,
+                        help="the number of HTTP replays averaged, they take milliseconds each, default 20")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="the slowdown against the baseline reported as a regression, default 0.1")
+    return parser.parse_args()
+
+
+def run(args: Namespace) -> dict:
+    """Runs the games, teams and stats scrapers on one browser, recording or replaying the pages.
+    The batters are written to a throwaway database and json file so `data/batters.json` is left alone.
+
+    Returns:
+        `dict`: The total runtime, the peak memory and the average seconds of every page stage."""
+    if args.record:
+        makedirs(BENCHMARK_DIR, exist_ok=True)
+        day = datetime.today()
+    else:
+        if not path.exists(HAR_PATH):
+            raise SystemExit(f"No recorded pages in {HAR_PATH}, run with --record first")
+        with open(META_PATH, "r", encoding="UTF-8") as file:
+            day = datetime.fromisoformat(json.load(file)["day"])
+
+    instrumentation.reset()
+    browser = Browser()
+    browser.start_browser(is_headless=True, is_lean=args.lean, har_path=HAR_PATH, record_har=args.record)
+    start = perf_counter()
+    with TemporaryDirectory() as directory:
+        database = Database(path.join(directory, "benchmark.db"))
+        try:
+            has_teams, teams_playing = GamesTodayScraper(browser, day).get_games()
+            if not has_teams:
+                raise SystemExit(f"No games on {day.date()}, nothing to benchmark")
+            teams = teams_playing[:args.teams]
+            batters = TeamsScraper(browser, database=database).get_batters(args.batters, teams)
+            StatsScraper(browser, args.pages, database=database,
+                         export_path=path.join(directory, "batters.json")).get_stats(batters)
+            total_seconds = perf_counter() - start
+        finally:
+            database.close()
+            browser.close_browser()
+
+    if args.record:
+        with open(META_PATH, "w", encoding="UTF-8") as file:
+            json.dump({"day": day.date().isoformat(), "teams": teams, "batters": len(batters)}, file, indent=2)
+
+    stages = instrumentation.totals()
+    return {
+        "total_seconds": round(total_seconds, 3),
+        "python_peak_mb": round(python_peak_kb() / 1024, 1),
+        "browser_peak_mb": round(instrumentation.browser_peak_kb / 1024, 1),
+        "pages": {name: round(stages[name][1] / stages[name][0], 4) for name in PAGE_STAGES if name in stages},
+    }
+
+
+def make_fixture_fetcher(pool_size: int = 1) -> Fetcher:
+    """Returns a fetcher without page cache that is served the fixtures instead of the network."""
+    fetcher = Fetcher(pool_size=pool_size)
+    fetcher.session.mount("https://", FixtureAdapter())
+    return fetcher
+
+
+def check_parsers() -> None:
+    """Checks that the HTTP backend reads the fixtures as expected: the top batters of a team page,
+    without its header rows, footer and commented tables, and the newest games of a gamelog with
+    the doubleheader numbered. Exits with the mismatches."""
+    fetcher = make_fixture_fetcher()
+    failures = []
+    try:
+        team = TeamDirectory.load().get("NYY")
+        rows = TeamsScraper(fetcher=fetcher)._get_rows_from_html(team, 3)
+        ids = [row["player"]["data-append-csv"] for row in rows]
+        if ids != ["judgeaa01", "torregl01", "kineris01"]:
+            failures.append(f"top NYY batters are {ids}")
+
+        gamelog = fetcher.get_html("https://www.baseball-reference.com/players/gl.fcgi?id=judgeaa01&t=b&year=2022")
+        if len(parse_table(gamelog, "#div_batting_gamelogs")) != 12:
+            failures.append(f"the gamelog has {len(parse_table(gamelog, '#div_batting_gamelogs'))} rows, not 12")
+        games = StatsScraper(fetcher=fetcher)._get_games_from_html(Batter("judgeaa01", "Aaron Judge", team))
+        newest = games[0]
+        if (newest.get_date(), newest.get_team_played(), newest.get_hits(), newest.get_at_bats()) != \
+                ("2022-09-01", "@TBR", 0, 0):
+            failures.append(f"the newest game is {newest.to_dict()}")
+        doubleheader = [game.get_game_number() for game in games if game.get_date() == "2022-08-27"]
+        if len(games) != 10 or doubleheader != [2, 1]:
+            failures.append(f"{len(games)} games with the doubleheader numbered {doubleheader}")
+    finally:
+        fetcher.close()
+
+    if failures:
+        raise SystemExit("The fixtures were not parsed as expected:\n" + "\n".join(failures))
+    print("The fixtures were parsed as expected")
+
+
+def run_http(args: Namespace) -> dict:
+    """Runs the stats api schedule, teams and stats scrapers on the HTTP backend `rounds` times,
+    with the fixtures served in place of the network.
+
+    Returns:
+        `dict`: The average runtime of a round, the peak memory and the average seconds of every
+        HTTP stage."""
+    instrumentation.reset()
+    total_seconds = 0
+    with TemporaryDirectory() as directory:
+        for _ in range(args.rounds):
+            database = Database(path.join(directory, "benchmark.db"))
+            fetcher = make_fixture_fetcher(args.pages)
+            start = perf_counter()
+            try:
+                with instrumentation.stage("schedule"):
+                    games = StatsApiScheduleProvider(fetcher, FIXTURE_DAY).get_schedule()
+                teams = sorted({team for game in games for team in game.get_teams()})[:args.teams]
+                batters = TeamsScraper(fetcher=fetcher, database=database).get_batters(args.batters, teams)
+                stats_scraper = StatsScraper(num_pages=args.pages, fetcher=fetcher, database=database,
+                                             export_path=path.join(directory, "batters.json"))
+                stats_scraper.set_schedule(get_next_games(games), get_last_games(games, FIXTURE_DAY))
+                stats_scraper.get_stats(batters)
+                total_seconds += perf_counter() - start
+            finally:
+                database.close()
+                fetcher.close()
+
+    stages = instrumentation.totals()
+    return {
+        "total_seconds": round(total_seconds / args.rounds, 4),
+        "python_peak_mb": round(python_peak_kb() / 1024, 1),
+        "pages": {name: round(stages[name][1] / stages[name][0], 5) for name in HTTP_STAGES if name in stages},
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Prints every measurement next to the baseline.
+
+    Returns:
+        `bool`: True if nothing is slower or bigger than the baseline by more than the tolerance."""
+    measurements = [(name, results[name], baseline.get(name))
+                    for name in ["total_seconds", "python_peak_mb", "browser_peak_mb"] if name in results]
+    measurements += [(f"page {name}", seconds, baseline.get("pages", {}).get(name))
+                     for name, seconds in results["pages"].items()]
+
+    is_within = True
+    for name, value, base in measurements:
+        if not base:
+            print(f"{name}: {value} (no baseline)")
+            continue
+        change = (value - base) / base
+        is_regression = change > tolerance
+        is_within = is_within and not is_regression
+        print(f"{name}: {value} vs {base} ({change:+.0%}){' REGRESSION' if is_regression else ''}")
+    return is_within
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.check or args.http:
+        check_parsers()
+    if args.check:
+        raise SystemExit(0)
+    mode = "http" if args.http else "browser"
+    results = run_http(args) if args.http else run(args)
+    if args.record:
+        print(f"Recorded the pages to {HAR_PATH}")
+    print(json.dumps(results, indent=2))
+    if args.record:
+        raise SystemExit(0)
+
+    baselines = {}
+    if path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "r", encoding="UTF-8") as file:
+            baselines = json.load(file)
+    if args.save_baseline:
+        baselines[mode] = results
+        with open(BASELINE_PATH, "w", encoding="UTF-8") as file:
+            json.dump(baselines, file, indent=2)
+        print(f"Saved the {mode} baseline to {BASELINE_PATH}")
+    elif mode in baselines:
+        if not compare(results, baselines[mode], args.tolerance):
+            raise SystemExit(1)
@@ -0,0 +1,103 @@
+from typing import Dict, List, Tuple
+import numpy as np
+from components.batter import Batter
+
+
+class Analytics:
+    """Vectorized recent-form metrics for many batters at once. The game logs are laid out as
+    a batters x games matrix, newest game first, with a mask for the games each batter has.
+    Windows count games, so both games of a doubleheader count, and games without an at bat
+    count for hits per game but not for batting average, streaks or hit probability."""
+    batters: List[Batter]
+    windows: Tuple[int, ...]
+    alpha: float
+    hits: np.ndarray
+    at_bats: np.ndarray
+    played: np.ndarray
+
+    def __init__(self, batters: List[Batter], windows: Tuple[int, ...] = (5, 10, 20), alpha: float = 0.3):
+        """Parameters:
+            `batters` (List[Batter]): The batters to compute the metrics of.
+            `windows` (Tuple[int, ...]): The window sizes in games. Default is (5, 10, 20).
+            `alpha` (float): The smoothing factor of the exponentially weighted average. Default is 0.3."""
+        self.batters = batters
+        self.windows = windows
+        self.alpha = alpha
+        self.hits, self.at_bats, self.played = self._build_matrices()
+
+    def hits_per_game(self, window: int) -> np.ndarray:
+        """Returns the hits per game over the last `window` games of every batter."""
+        hits = self.hits[:, :window].sum(axis=1)
+        games = self.played[:, :window].sum(axis=1)
+        return self._divide(hits, games)
+
+    def batting_average(self, window: int) -> np.ndarray:
+        """Returns hits over at bats in the last `window` games of every batter."""
+        hits = self.hits[:, :window].sum(axis=1)
+        at_bats = self.at_bats[:, :window].sum(axis=1)
+        return self._divide(hits, at_bats)
+
+    def weighted_hits_per_game(self) -> np.ndarray:
+        """Returns the exponentially weighted hits per game of every batter, newest game weighted most."""
+        weights = (1 - self.alpha) ** np.arange(self.hits.shape[1])
+        weights = weights * self.played
+        return self._divide((self.hits * weights).sum(axis=1), weights.sum(axis=1))
+
+    def hit_streak(self) -> np.ndarray:
+        """Returns the amount of games in a row, up to the newest, every batter has had a hit in.
+        Games without an at bat neither extend nor break the streak."""
+        counted = self.played & (self.at_bats > 0)
+        breaks = counted & (self.hits == 0)
+        before_break = np.cumsum(breaks, axis=1) == 0
+        return (counted & before_break).sum(axis=1)
+
+    def hit_probability(self, window: int) -> np.ndarray:
+        """Returns the chance of at least one hit in a game for every batter, from the batting
+        average and the at bats per game over the last `window` games."""
+        at_bats = self.at_bats[:, :window]
+        games_with_at_bats = (self.played[:, :window] & (at_bats > 0)).sum(axis=1)
+        at_bats_per_game = self._divide(at_bats.sum(axis=1), games_with_at_bats)
+        return 1 - (1 - self.batting_average(window)) ** at_bats_per_game
+
+    def metrics(self) -> Dict[str, np.ndarray]:
+        """Returns every metric keyed by name, e.g. `hits_per_game_10`, each in batters order."""
+        metrics: Dict[str, np.ndarray] = {
+            "weighted_hits_per_game": self.weighted_hits_per_game(),
+            "hit_streak": self.hit_streak(),
+        }
+        for window in self.windows:
+            metrics[f"hits_per_game_{window}"] = self.hits_per_game(window)
+            metrics[f"batting_average_{window}"] = self.batting_average(window)
+            metrics[f"hit_probability_{window}"] = self.hit_probability(window)
+        return metrics
+
+    def rank(self, metric: str = "hits_per_game_10") -> List[Batter]:
+        """Returns the batters sorted by the metric, highest first. Values are compared rounded to
+        three places like the exported moving average, ties keep the batters order.
+
+        Parameters:
+            `metric` (str): The name of the metric. Default is "hits_per_game_10"."""
+        values = np.round(self.metrics()[metric], 3)
+        order = np.argsort(-values, kind="stable")
+        return [self.batters[index] for index in order]
+
+    def _build_matrices(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Lays out the game logs as batters x games matrices, newest game first."""
+        logs = [batter.get_game_log() for batter in self.batters]
+        width = max([len(log) for log in logs] + [1])
+        hits = np.zeros((len(logs), width), dtype=np.int16)
+        at_bats = np.zeros((len(logs), width), dtype=np.int16)
+        played = np.zeros((len(logs), width), dtype=bool)
+        for row, log in enumerate(logs):
+            count = len(log)
+            if count == 0:
+                continue
+            hits[row, :count] = np.frombuffer(log.hits, dtype=np.int16)[::-1]
+            at_bats[row, :count] = np.frombuffer(log.at_bats, dtype=np.int16)[::-1]
+            played[row, :count] = True
+        return hits, at_bats, played
+
+    def _divide(self, numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        """Divides element wise, 0 where the denominator is 0."""
+        numerator = numerator.astype(float)
+        return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
@@ -0,0 +1,93 @@
+from time import perf_counter
+from playwright.async_api import async_playwright
+from playwright.async_api import Browser, Page, Playwright, BrowserContext
+from os import name
+from components.async_readiness import AsyncReadiness
+from components.browser import LEAN_ARGS, _content_length, _give_feedback
+from components.rate_limiter import HostRateLimiter
+from components.request_filter import RequestFilter
+from components.instrumentation import instrumentation
+
+
+class AsyncBrowser:
+    """Asyncio version of `Browser`, drives the playwright browser with the async api so
+    several pages can load at the same time."""
+    playwright: Playwright
+    browser: Browser
+    context: BrowserContext
+    page: Page
+    readiness: AsyncReadiness
+    request_filter: RequestFilter = None
+    rate_limiter: HostRateLimiter = None
+
+    async def start_browser(self, is_headless: bool = True, is_lean: bool = False,
+                            request_filter: RequestFilter = None, rate_limiter: HostRateLimiter = None) -> None:
+        """Boots up the browser with necessary settings.
+        Parameters:
+            `is_headless` (bool): Whether or not to start the browser in headless mode. Default is True.
+            `is_lean` (bool): Whether or not to use a smaller viewport, memory saving launch args and
+            block the requests the scrapers do not need. Default is False.
+            `request_filter` (RequestFilter): The filter used when lean. Default blocks images, media,
+            fonts, ads and analytics.
+            `rate_limiter` (HostRateLimiter): Paces `open_url` per host and is told how every page
+            responded. Default is None."""
+        self.rate_limiter = rate_limiter
+        self.playwright = await async_playwright().start()
+        await self._browser_decision(is_headless, is_lean)
+        if is_lean:
+            self.context = await self.browser.new_context(
+                viewport={"width": 1280, "height": 720}, service_workers="block")
+            self.request_filter = request_filter or RequestFilter()
+            await self.context.route("**/*", self.request_filter.handle_async)
+            self.context.on("response", self.request_filter.count_response)
+        else:
+            self.context = await self.browser.new_context(
+                viewport={"width": 1920, "height": 1080})
+        self.page = await self.context.new_page()
+        self.readiness = AsyncReadiness()
+
+    async def _browser_decision(self, is_headless: bool, is_lean: bool = False) -> None:
+        """Starts browser on chromium for Linux and firefox for Windows."""
+        if name == "posix":
+            args = LEAN_ARGS if is_lean else []
+            self.browser = await self.playwright.chromium.launch(headless=is_headless, args=args)
+        else:
+            self.browser = await self.playwright.firefox.launch(headless=is_headless)
+
+    async def new_page(self) -> Page:
+        """Opens an extra page in the current context.
+
+        Returns:
+            `Page`: The new page."""
+        return await self.context.new_page()
+
+    async def open_url(self, url: str, page: Page = None) -> None:
+        """Opens the url in the browser.
+
+        Parameters:
+            `url` (str): URL to be opened.
+            `page` (Page): Page to open the url in. Default is the main page."""
+        target = page if page is not None else self.page
+        if self.rate_limiter is not None:
+            await self.rate_limiter.wait_async(url)
+        start = perf_counter()
+        with instrumentation.stage("open_url", "network") as stage:
+            response = await target.goto(url, wait_until="commit", timeout=60000)
+            stage["bytes"] = _content_length(response)
+        _give_feedback(self.rate_limiter, url, response, perf_counter() - start)
+
+    async def close_browser(self) -> None:
+        """Closes the browser."""
+        await self.browser.close()
+        await self.playwright.stop()
+
+    def _fixed_seconds(self, seconds_posix: float, seconds_other: float) -> float:
+        """Returns the fixed wait for the current OS. Used to compare readiness waits against
+        the sleeps they replaced.
+
+        Parameters:
+            `seconds_posix` (float): Number of seconds if OS is linux.
+            `seconds_other` (float): Number of seconds if OS is not linux."""
+        if name == "posix":
+            return seconds_posix
+        return seconds_other
@@ -0,0 +1,90 @@
+from time import perf_counter
+from playwright.async_api import Page, ElementHandle
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from components.readiness import Readiness, TABLE_READY, TABLE_SORTED
+
+
+class AsyncReadiness(Readiness):
+    """Readiness waits for the async browser. Same conditions, timeouts and timings as `Readiness`."""
+
+    async def wait_for_selector(self, page: Page, selector: str, fixed: float = 0) -> ElementHandle:
+        """Waits until the element is visible.
+
+        Parameters:
+            `page` (Page): The page to wait on.
+            `selector` (str): The selector of the element.
+            `fixed` (float): Seconds of the fixed sleep this wait replaces. Default is 0.
+
+        Returns:
+            `ElementHandle`: The element."""
+        start = perf_counter()
+        try:
+            element = await page.wait_for_selector(selector, timeout=self.timeout, state="visible")
+            self._record(f"selector {selector}", start, fixed, True)
+            return element
+        except PlaywrightTimeoutError:
+            self._record(f"selector {selector}", start, fixed, False)
+            raise
+
+    async def wait_for_table(self, page: Page, table_id: str, min_rows: int = 1,
+                             fixed: float = 0) -> ElementHandle:
+        """Waits until the table is present and has at least `min_rows` body rows.
+
+        Parameters:
+            `page` (Page): The page to wait on.
+            `table_id` (str): The selector of the table.
+            `min_rows` (int): The least amount of rows the table must have. Default is 1.
+            `fixed` (float): Seconds of the fixed sleep this wait replaces. Default is 0.
+
+        Returns:
+            `ElementHandle`: The table."""
+        start = perf_counter()
+        try:
+            await page.wait_for_function(TABLE_READY, arg=[table_id, min_rows], timeout=self.timeout)
+            table = await page.wait_for_selector(table_id, timeout=self.timeout, state="visible")
+            self._record(f"table {table_id}", start, fixed, True)
+            return table
+        except PlaywrightTimeoutError:
+            self._record(f"table {table_id}", start, fixed, False)
+            raise
+
+    async def wait_for_sorted(self, page: Page, table_id: str, data_stat: str, descending: bool = True,
+                              fixed: float = 0) -> bool:
+        """Waits until the table rows are ordered by the data-stat column.
+
+        Parameters:
+            `page` (Page): The page to wait on.
+            `table_id` (str): The selector of the table.
+            `data_stat` (str): The data-stat attribute of the sorted column.
+            `descending` (bool): Whether the column should be descending. Default is True.
+            `fixed` (float): Seconds of the fixed sleep this wait replaces. Default is 0.
+
+        Returns:
+            `True` if the table was sorted in time, `False` if not."""
+        start = perf_counter()
+        try:
+            await page.wait_for_function(TABLE_SORTED, arg=[table_id, data_stat, descending],
+                                         timeout=self.timeout)
+            self._record(f"sort {table_id} by {data_stat}", start, fixed, True)
+            return True
+        except PlaywrightTimeoutError:
+            self._record(f"sort {table_id} by {data_stat}", start, fixed, False)
+            return False
+
+    async def wait_for_network_idle(self, page: Page, fixed: float = 0) -> bool:
+        """Waits until the page has had no network activity for 500 ms.
+
+        Parameters:
+            `page` (Page): The page to wait on.
+            `fixed` (float): Seconds of the fixed sleep this wait replaces. Default is 0.
+
+        Returns:
+            `True` if the network went quiet in time, `False` if not."""
+        start = perf_counter()
+        try:
+            await page.wait_for_load_state("networkidle", timeout=self.idle_timeout)
+            self._record("network idle", start, fixed, True)
+            return True
+        except PlaywrightTimeoutError:
+            self._record("network idle", start, fixed, False)
+            return False
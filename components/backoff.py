@@ -0,0 +1,52 @@
+from asyncio import sleep as sleep_async
+from random import uniform
+from time import sleep
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+def with_backoff(action: Callable[[], T], attempts: int = 3, base_delay: float = 2,
+                 max_delay: float = 30) -> T:
+    """Runs the action, retrying it with a jittered exponential backoff when it raises.
+
+    Parameters:
+        `action` (Callable[[], T]): The action to run.
+        `attempts` (int): The amount of times the action is tried. Default is 3.
+        `base_delay` (float): Seconds to wait before the first retry, doubled on every retry. Default is 2.
+        `max_delay` (float): The most seconds to wait before a retry. Default is 30.
+
+    Returns:
+        `T`: What the action returns. The last exception is raised if every attempt fails."""
+    for attempt in range(attempts):
+        try:
+            return action()
+        except Exception as exception:
+            if attempt == attempts - 1:
+                raise
+            delay = min(max_delay, base_delay * 2 ** attempt) * uniform(0.5, 1)
+            print(f"{type(exception).__name__}, retrying in {delay:.1f}s")
+            sleep(delay)
+
+
+async def with_backoff_async(action: Callable[[], Awaitable[T]], attempts: int = 3, base_delay: float = 2,
+                             max_delay: float = 30) -> T:
+    """Asyncio version of `with_backoff`, the action is awaited and the waits do not block the loop.
+
+    Parameters:
+        `action` (Callable[[], Awaitable[T]]): The action to run.
+        `attempts` (int): The amount of times the action is tried. Default is 3.
+        `base_delay` (float): Seconds to wait before the first retry, doubled on every retry. Default is 2.
+        `max_delay` (float): The most seconds to wait before a retry. Default is 30.
+
+    Returns:
+        `T`: What the action returns. The last exception is raised if every attempt fails."""
+    for attempt in range(attempts):
+        try:
+            return await action()
+        except Exception as exception:
+            if attempt == attempts - 1:
+                raise
+            delay = min(max_delay, base_delay * 2 ** attempt) * uniform(0.5, 1)
+            print(f"{type(exception).__name__}, retrying in {delay:.1f}s")
+            await sleep_async(delay)
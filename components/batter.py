@@ -1,24 +1,33 @@
 from typing import List, Tuple
 from components.batters_game import BattersGame
+from components.game_log import GameLog
 
 
 class Batter:
+    __slots__ = ("id", "name", "team_code", "team_name", "primary_color", "secondary_color",
+                 "moving_average", "game_log", "window", "total_hits")
     id: str
     name: str
     team_code: str
     team_name: str
     primary_color: str
     secondary_color: str
-    moving_average: float = 0.00
-    games: List[BattersGame] = []
+    moving_average: float
+    game_log: GameLog
+    window: int
+    total_hits: int
 
-    def __init__(self, id: str, name: str, team: dict):
+    def __init__(self, id: str, name: str, team: dict, window: int = 10):
         self.id = id
         self.name = name
         self.team_code = team["team_code"]
         self.team_name = team["team_name"]
         self.primary_color = team["primary_color"]
         self.secondary_color = team["secondary_color"]
+        self.moving_average = 0.00
+        self.game_log = GameLog()
+        self.window = window
+        self.total_hits = 0
 
     def get_id(self) -> str:
         return self.id
@@ -33,21 +42,37 @@ class Batter:
         return self.id, self.name, self.team_name
 
     def add_games(self, batters_games: List[BattersGame]) -> None:
-        self.games = batters_games
+        """Replaces the games, newest first."""
+        self.game_log = GameLog()
+        self.total_hits = 0
+        self.merge_games(batters_games)
+
+    def merge_games(self, new_games: List[BattersGame]) -> None:
+        """Adds games newer than the ones already held, newest first. The running hit total
+        of the window is updated per game as the oldest game falls out of it."""
+        for game in reversed(new_games):
+            self.game_log.append(game)
+            self.total_hits += game.get_hits()
+            if len(self.game_log) > self.window:
+                self.total_hits -= self.game_log.hits_at(self.window)
         self.calculate_moving_average()
 
     def get_batting_games(self) -> List[BattersGame]:
-        return self.games
+        """Returns the games in the window, newest first."""
+        return self.game_log.newest(self.window)
 
-    def calculate_moving_average(self) -> None:
-        total_hits = 0
-        number_of_games = len(self.games)
+    def get_all_games(self) -> List[BattersGame]:
+        """Returns every game in the game log, newest first."""
+        return self.game_log.newest()
 
-        for game in self.games:
-            total_hits += game.get_hits()
+    def get_game_log(self) -> GameLog:
+        return self.game_log
+
+    def calculate_moving_average(self) -> None:
+        number_of_games = min(len(self.game_log), self.window)
 
         if number_of_games > 0:
-            self.moving_average = round(total_hits / number_of_games, 3)
+            self.moving_average = round(self.total_hits / number_of_games, 3)
         else:
             self.moving_average = round(0, 2)
 
@@ -60,5 +85,5 @@ class Batter:
             "primary_color": self.primary_color,
             "secondary_color": self.secondary_color,
             "moving_average": self.moving_average,
-            "games": [game.to_dict() for game in self.games]
+            "games": [game.to_dict() for game in self.get_batting_games()]
         }
@@ -1,18 +1,32 @@
+from typing import Tuple
+
+
 class BattersGame:
+    __slots__ = ("date", "team_played", "hits", "at_bats", "game_number")
     date: str
     team_played: str
     hits: int
     at_bats: int
+    game_number: int
 
-    def __init__(self, date: str, team_played: str, hits: int, at_bats: int):
+    def __init__(self, date: str, team_played: str, hits: int, at_bats: int, game_number: int = 1):
         self.date = date
         self.team_played = team_played
         self.hits = hits
         self.at_bats = at_bats
+        self.game_number = game_number
 
     def get_date(self) -> str:
         return self.date
 
+    def get_game_number(self) -> int:
+        """Returns the game of the day, 2 for the second game of a doubleheader."""
+        return self.game_number
+
+    def get_key(self) -> Tuple[str, int]:
+        """Returns the key that orders the games, the date then the game of the day."""
+        return (self.date, self.game_number)
+
     def get_team_played(self) -> str:
         return self.team_played
 
@@ -1,44 +1,248 @@
-from typing import List
+from time import perf_counter
+from typing import List, Set
 from playwright.sync_api import sync_playwright
-from playwright.sync_api import Browser, Page, Playwright, BrowserContext, ElementHandle
+from playwright.sync_api import Browser, BrowserType, Page, Playwright, BrowserContext, ElementHandle, Response
 from os import name
+from components.readiness import Readiness
+from components.request_filter import RequestFilter
+from components.instrumentation import instrumentation, _children_rss_kb
+from components.rate_limiter import HostRateLimiter, retry_after_seconds
+
+LEAN_ARGS = [
+    "--disable-dev-shm-usage", "--disable-gpu", "--disable-extensions", "--disable-background-networking",
+    "--disable-component-update", "--disable-sync", "--no-first-run", "--mute-audio",
+    "--renderer-process-limit=2", "--js-flags=--max-old-space-size=256",
+]
+NO_IMAGES_ARG = "--blink-settings=imagesEnabled=false"
 
 
 class Browser:
-    """Generic browser class with core methods to drive the playwright browser."""
+    """Generic browser class with core methods to drive the playwright browser.
+    The browser is launched fresh by default. With a user data dir the profile, and with it the
+    disk cache, cookies and consent state, is kept between runs. With a CDP url the pages are
+    opened in a long lived browser that is already running, so starting takes no launch at all."""
     playwright: Playwright
     browser: Browser
     context: BrowserContext
     page: Page
+    readiness: Readiness
+    request_filter: RequestFilter = None
+    memory_limit_kb: int = None
+    rate_limiter: HostRateLimiter = None
+    _settings: dict
+    _is_remote: bool
+    _is_attached: bool
+    _attached_pages: Set[Page]
+    _blocked_urls: List[str]
 
-    def start_browser(self, is_headless: bool = True) -> None:
+    def start_browser(self, is_headless: bool = True, is_lean: bool = False,
+                      request_filter: RequestFilter = None, har_path: str = None, record_har: bool = False,
+                      user_data_dir: str = None, cdp_url: str = None, memory_limit_mb: int = None,
+                      rate_limiter: HostRateLimiter = None) -> None:
         """Boots up the browser with necessary settings.
         Parameters:
-            `is_headless` (bool): Whether or not to start the browser in headless mode. Default is True."""
-        # self._clear_terminal()
-        self.playwright = sync_playwright().start()
-        self._browser_decision(is_headless)
-        self.context = self.browser.new_context(
-            viewport={"width": 1920, "height": 1080})
-        self.page = self.context.new_page()
-
-    def _browser_decision(self, is_headless: bool) -> None:
+            `is_headless` (bool): Whether or not to start the browser in headless mode. Default is True.
+            `is_lean` (bool): Whether or not to use a smaller viewport, memory saving launch args and
+            block the requests the scrapers do not need. Requests are routed through the filter,
+            except in a browser that keeps its HTTP cache, a profile or an attached one, where
+            routing would turn the cache off and chromium blocks them by url. Default is False.
+            `request_filter` (RequestFilter): The filter used when lean. Default blocks images, media,
+            fonts, ads and analytics.
+            `har_path` (str): A HAR file the pages are served from, requests missing from it are
+            aborted. Default is None, pages come from the network.
+            `record_har` (bool): Whether to record the pages to `har_path` instead, written when the
+            browser is closed. Default is False.
+            `user_data_dir` (str): The profile folder of a persistent context, kept between runs.
+            Default is None, a fresh context is used.
+            `cdp_url` (str): The CDP endpoint of a running chromium to attach to, ex: "http://localhost:9222".
+            The browser is launched as usual when it cannot be reached. Default is None.
+            `memory_limit_mb` (int): The browser memory above which `ensure_healthy` restarts it.
+            Default is None, memory is not checked.
+            `rate_limiter` (HostRateLimiter): Paces `open_url` per host and is told how every page
+            responded. Default is None."""
+        self._settings = dict(is_headless=is_headless, is_lean=is_lean, request_filter=request_filter,
+                              har_path=har_path, record_har=record_har, user_data_dir=user_data_dir,
+                              cdp_url=cdp_url, memory_limit_mb=memory_limit_mb, rate_limiter=rate_limiter)
+        self.memory_limit_kb = memory_limit_mb * 1024 if memory_limit_mb is not None else None
+        self.rate_limiter = rate_limiter
+        self._is_remote = False
+        self._is_attached = False
+        self._attached_pages = set()
+        self._blocked_urls = []
+        if is_lean:
+            self.request_filter = request_filter or RequestFilter()
+        with instrumentation.stage("start_browser"):
+            self.playwright = sync_playwright().start()
+            context_options = self._context_options(is_lean, har_path, record_har)
+            if cdp_url is None or not self._attach(cdp_url, context_options):
+                self._launch(is_headless, is_lean, user_data_dir, context_options)
+            if is_lean:
+                self._filter_requests(user_data_dir is not None or self._is_attached)
+            if har_path is not None and not record_har:
+                self.context.route_from_har(har_path, not_found="abort")
+            self.page = self._first_page(user_data_dir is not None and not self._is_remote)
+            if self._is_attached:
+                self.page.set_viewport_size(context_options["viewport"])
+        self.readiness = Readiness()
+
+    def _context_options(self, is_lean: bool, har_path: str, record_har: bool) -> dict:
+        """Returns the options of the browser context."""
+        options = {"record_har_path": har_path, "record_har_content": "embed"} if record_har else {}
+        if is_lean:
+            options.update(viewport={"width": 1280, "height": 720}, service_workers="block")
+        else:
+            options.update(viewport={"width": 1920, "height": 1080})
+        return options
+
+    def _first_page(self, is_persistent: bool) -> Page:
+        """Returns the main page. A persistent context opens with a tab of its own, it is reused
+        instead of keeping an idle second page open for the whole run."""
+        if is_persistent and self.context.pages:
+            page = self.context.pages[0]
+            self._block_urls(page)
+            return page
+        return self.new_page()
+
+    def _filter_requests(self, keeps_cache: bool) -> None:
+        """Blocks the requests the request filter rejects. A chromium that keeps its HTTP cache
+        blocks them by url over CDP, see `_block_urls`, any other browser routes them."""
+        self.context.on("response", self.request_filter.count_response)
+        if keeps_cache and (self._is_remote or name == "posix"):
+            self._blocked_urls = self.request_filter.url_patterns()
+            self.context.on("requestfinished", self.request_filter.count_finished)
+            self.context.on("requestfailed", self.request_filter.count_failed)
+        else:
+            self.context.route("**/*", self.request_filter.handle)
+
+    def _block_urls(self, page: Page) -> None:
+        """Has chromium block the filtered urls on the page. Unlike routing this leaves the HTTP
+        cache on."""
+        if self._blocked_urls:
+            session = self.context.new_cdp_session(page)
+            session.send("Network.enable")
+            session.send("Network.setBlockedURLs", {"urls": self._blocked_urls})
+
+    def _attach(self, cdp_url: str, context_options: dict) -> bool:
+        """Connects to a running chromium over CDP. Its default context is used so its cache and
+        cookies are shared, unless pages are recorded, which needs a context of its own.
+
+        Returns:
+            `bool`: True if the browser could be reached."""
+        try:
+            self.browser = self.playwright.chromium.connect_over_cdp(cdp_url)
+        except Exception as exception:
+            print(f"Could not attach to {cdp_url} ({type(exception).__name__}), launching the browser")
+            return False
+        self._is_remote = True
+        if self.browser.contexts and "record_har_path" not in context_options:
+            self.context = self.browser.contexts[0]
+            self._is_attached = True
+            self._attached_pages = set(self.context.pages)
+        else:
+            self.context = self.browser.new_context(**context_options)
+        return True
+
+    def _launch(self, is_headless: bool, is_lean: bool, user_data_dir: str, context_options: dict) -> None:
+        """Launches the browser, on a persistent context when there is a user data dir."""
+        if user_data_dir is None:
+            self._browser_decision(is_headless, is_lean)
+            self.context = self.browser.new_context(**context_options)
+            return
+        args = LEAN_ARGS if is_lean and name == "posix" else []
+        if args and "image" in self.request_filter.blocked_types:
+            args = args + [NO_IMAGES_ARG]
+        self.context = self._browser_type().launch_persistent_context(
+            user_data_dir, headless=is_headless, args=args, **context_options)
+        self.browser = self.context.browser
+
+    def _browser_type(self) -> BrowserType:
+        """Returns chromium for Linux and firefox for Windows."""
+        return self.playwright.chromium if name == "posix" else self.playwright.firefox
+
+    def _browser_decision(self, is_headless: bool, is_lean: bool = False) -> None:
         """Starts browser on chromium for Linux and firefox for Windows."""
         if name == "posix":
-            self.browser = self.playwright.chromium.launch(headless=is_headless)
+            args = LEAN_ARGS if is_lean else []
+            self.browser = self.playwright.chromium.launch(headless=is_headless, args=args)
         else:
             self.browser = self.playwright.firefox.launch(headless=is_headless)
 
-    def open_url(self, url: str) -> None:
+    def memory_kb(self) -> int:
+        """Returns the memory the browser uses. That is the RSS of the browser processes when it was
+        launched by this process, and the JS heap of the pages opened in an attached browser."""
+        if not self._is_remote:
+            return _children_rss_kb()
+        heap = 0
+        for page in self.context.pages:
+            if page not in self._attached_pages:
+                heap += page.evaluate("() => performance.memory ? performance.memory.usedJSHeapSize : 0")
+        return heap // 1024
+
+    def is_healthy(self) -> bool:
+        """Returns True if the main page still answers and the browser is within its memory limit."""
+        try:
+            self.page.evaluate("() => 1")
+        except Exception:
+            print("The browser does not answer")
+            return False
+        if self.memory_limit_kb is not None and self.memory_kb() > self.memory_limit_kb:
+            print(f"The browser uses {self.memory_kb() / 1024:.0f} MB, over its {self.memory_limit_kb / 1024:.0f} MB limit")
+            return False
+        return True
+
+    def ensure_healthy(self) -> bool:
+        """Restarts the browser with the same settings when it is not healthy. Pages opened before
+        a restart are closed by it.
+
+        Returns:
+            `bool`: True if the browser was restarted."""
+        if self.is_healthy():
+            return False
+        print("Restarting the browser")
+        readiness = self.readiness
+        try:
+            self.close_browser()
+        except Exception as exception:
+            print(f"Closing the browser failed ({type(exception).__name__})")
+        self.start_browser(**dict(self._settings, request_filter=self.request_filter))
+        self.readiness = readiness
+        return True
+
+    def new_page(self) -> Page:
+        """Opens an extra page in the current context. Used to work on several pages at once.
+
+        Returns:
+            `Page`: The new page."""
+        page = self.context.new_page()
+        self._block_urls(page)
+        return page
+
+    def open_url(self, url: str, page: Page = None) -> None:
         """Opens the url in the browser.
 
         Parameters:
-            `url` (str): URL to be opened."""
-        self.page.goto(url, wait_until="commit", timeout=12000000)
+            `url` (str): URL to be opened.
+            `page` (Page): Page to open the url in. Default is the main page."""
+        target = page if page is not None else self.page
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(url)
+        start = perf_counter()
+        with instrumentation.stage("open_url", "network") as stage:
+            response = target.goto(url, wait_until="commit", timeout=60000)
+            stage["bytes"] = _content_length(response)
+        _give_feedback(self.rate_limiter, url, response, perf_counter() - start)
 
     def close_browser(self) -> None:
-        """Closes the browser."""
-        self.browser.close()
+        """Closes the browser. An attached browser keeps running, only the pages opened in it are
+        closed before disconnecting."""
+        if self._is_attached:
+            for page in self.context.pages:
+                if page not in self._attached_pages:
+                    page.close()
+        else:
+            self.context.close()
+        if self.browser is not None:
+            self.browser.close()
         self.playwright.stop()
 
     def _clear_terminal(self):
@@ -61,7 +265,34 @@ class Browser:
         Parameters:
             `seconds_posix` (int): Number of seconds to wait if OS is linux.
             `seconds_other` (int): Number of seconds to wait if OS is not linux."""
+        with instrumentation.stage("wait", "sleep"):
+            self.page.wait_for_timeout(self._fixed_seconds(seconds_posix, seconds_other) * 1000)
+
+    def _fixed_seconds(self, seconds_posix: float, seconds_other: float) -> float:
+        """Returns the fixed wait for the current OS. Used to compare readiness waits against
+        the sleeps they replaced.
+
+        Parameters:
+            `seconds_posix` (float): Number of seconds if OS is linux.
+            `seconds_other` (float): Number of seconds if OS is not linux."""
         if name == "posix":
-            self.page.wait_for_timeout(seconds_posix * 1000)
-        else:
-            self.page.wait_for_timeout(seconds_other * 1000)
+            return seconds_posix
+        return seconds_other
+
+
+def _give_feedback(rate_limiter: HostRateLimiter, url: str, response: Response, seconds: float) -> None:
+    """Tells the rate limiter, if there is one, how the page responded."""
+    if rate_limiter is None:
+        return
+    if response is None:
+        rate_limiter.feedback(url, 0, seconds)
+        return
+    rate_limiter.feedback(url, response.status, seconds, retry_after_seconds(response.headers.get("retry-after")))
+
+
+def _content_length(response: Response) -> int:
+    """Returns the Content-Length of the response, 0 if there is no response or header."""
+    if response is None:
+        return 0
+    length = response.headers.get("content-length", "")
+    return int(length) if length.isdigit() else 0
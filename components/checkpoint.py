@@ -0,0 +1,82 @@
+import json
+from datetime import datetime
+from os import path, makedirs
+from threading import Lock
+from typing import Dict, Tuple
+
+
+class Checkpoint:
+    """Append-only JSON lines journal of the teams and batters a run has finished or failed.
+    A resumed run skips the finished units and restores their data from the journal, a new
+    run starts the journal over. Records are stamped with the day they were made on, a resumed
+    run ignores the ones of another day."""
+    file_path: str
+    day: str
+    _records: Dict[Tuple[str, str], dict]
+    _lock: Lock
+
+    def __init__(self, file_path: str = "data/checkpoint.jsonl", resume: bool = False):
+        """Parameters:
+            `file_path` (str): The journal file. Default is "data/checkpoint.jsonl".
+            `resume` (bool): Whether or not to continue from the journal. Default is False."""
+        self.file_path = file_path
+        self.day = datetime.today().strftime("%Y-%m-%d")
+        self._records = {}
+        self._lock = Lock()
+        directory = path.dirname(file_path)
+        if directory and not path.exists(directory):
+            makedirs(directory, exist_ok=True)
+        if resume and path.exists(file_path):
+            self._load()
+        else:
+            open(file_path, "w").close()
+
+    def is_done(self, kind: str, key: str) -> bool:
+        """Returns True if the unit was finished.
+
+        Parameters:
+            `kind` (str): The kind of unit, "team" or "batter".
+            `key` (str): The team code or batter id."""
+        record = self._records.get((kind, key))
+        return record is not None and record["status"] == "done"
+
+    def get(self, kind: str, key: str) -> dict:
+        """Returns the last journal record of the unit, or None if there is none.
+
+        Parameters:
+            `kind` (str): The kind of unit, "team" or "batter".
+            `key` (str): The team code or batter id."""
+        return self._records.get((kind, key))
+
+    def record(self, kind: str, key: str, status: str, **data) -> None:
+        """Appends a record for the unit to the journal.
+
+        Parameters:
+            `kind` (str): The kind of unit, "team" or "batter".
+            `key` (str): The team code or batter id.
+            `status` (str): "done" or "failed".
+            `data`: The data needed to restore the unit."""
+        record = dict(data, kind=kind, key=key, status=status, day=self.day)
+        with self._lock:
+            self._records[(kind, key)] = record
+            with open(self.file_path, "a", encoding="UTF-8") as file:
+                file.write(json.dumps(record) + "\n")
+
+    def summary(self) -> str:
+        """Returns how many units are done and failed in the journal."""
+        statuses = [record["status"] for record in self._records.values()]
+        return f"{statuses.count('done')} units done, {statuses.count('failed')} failed"
+
+    def _load(self) -> None:
+        """Loads the journal of today, later records of a unit replace earlier ones."""
+        with open(self.file_path, "r", encoding="UTF-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("day") != self.day:
+                    continue
+                self._records[(record["kind"], record["key"])] = record
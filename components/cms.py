@@ -1,10 +1,62 @@
 import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from hashlib import sha256
+from os import path
+from time import perf_counter
 from typing import List, Tuple
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
 from components.batter import Batter
-from requests import post, get
+from components.backoff import with_backoff
+from components.instrumentation import instrumentation
+
+REVALIDATE_URL = "https://mlb-hit-helper.vercel.app/api/revalidate"
+RETRY_STATUSES = [429, 500, 502, 503, 504]
 
 
 class CMS:
+    """Updates, publishes and revalidates the batter stats. The hash of the last published
+    stats is kept in `state_path` once all three calls succeed, when the stats have not changed
+    nothing is sent.
+    Calls go through one keep-alive session with timeouts, and are retried with a jittered
+    backoff on connection errors and 429/5xx responses. The revalidate call runs in the
+    background, `close` waits for every one of them."""
+    state_path: str
+    credentials_path: str
+    revalidate_url: str
+    timeout: Tuple[float, float]
+    attempts: int
+    calls: List[Tuple[str, int, float, int]]
+    session: Session
+    _credentials: Tuple[str, str, str]
+    _executor: ThreadPoolExecutor
+    _revalidations: List[Future]
+
+    def __init__(self, state_path: str = "data/cms_state.json", credentials_path: str = "credentials.json",
+                 revalidate_url: str = REVALIDATE_URL, timeout: Tuple[float, float] = (5, 30),
+                 attempts: int = 3):
+        """Parameters:
+            `state_path` (str): The file the hash of the last published stats is kept in.
+            Default is "data/cms_state.json".
+            `credentials_path` (str): The file with the endpoint and tokens. Default is "credentials.json".
+            `revalidate_url` (str): The revalidate api of the frontend, a `revalidate_url` in the
+            credentials takes precedence. Default is the production frontend.
+            `timeout` (Tuple[float, float]): The connect and read timeouts in seconds. Default is (5, 30).
+            `attempts` (int): The amount of times a call is tried. Default is 3."""
+        self.state_path = state_path
+        self.credentials_path = credentials_path
+        self.revalidate_url = revalidate_url
+        self.timeout = timeout
+        self.attempts = attempts
+        self.calls = []
+        self.session = Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self._credentials = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._revalidations = []
+
     def update_cms(self, batters: List[Batter]) -> None:
         """Update the CMS that holds all of the batter stats.
 
@@ -13,37 +65,75 @@ class CMS:
         # converts list of batters to json
         batters_json = [batter.to_dict() for batter in batters]
 
+        # skip every call when the stats are the ones already published
+        stats_hash = self._hash(batters_json)
+        if stats_hash == self._load_published_hash():
+            print("Stats unchanged since the last publish, skipping the CMS update.")
+            return
+
         # get necessary variables from config file
         endpoint, cms_auth_token, revalidate_token = self._get_config_variables()
         auth_header = self._get_auth_header(cms_auth_token)
 
-        # update stats, publish, and revalidate the endpoint
+        # update stats, publish, and revalidate the endpoint in the background. The hash is saved
+        # once the revalidate succeeds, a failed one is retried by the next run
         self._update_stats(endpoint, batters_json, auth_header)
         self._publish_stats(endpoint, auth_header)
-        self._revalidate_endpoint(revalidate_token)
+        self._revalidations.append(self._executor.submit(self._revalidate_and_save, revalidate_token, stats_hash))
+
+    def close(self) -> None:
+        """Waits for every revalidate call, reports the ones that failed and closes the session."""
+        for number, revalidation in enumerate(self._revalidations, 1):
+            try:
+                revalidation.result()
+            except Exception as exception:
+                print(f"Revalidate {number} of {len(self._revalidations)} failed: {exception}")
+        self._revalidations = []
+        self._executor.shutdown()
+        self.session.close()
+
+    def summary(self) -> str:
+        """Returns the payload size and latency of every call made."""
+        if not self.calls:
+            return "no calls made"
+        return ", ".join(f"{name} {size / 1024:.1f} KB in {seconds:.2f}s ({status})"
+                         for name, size, seconds, status in self.calls)
 
     def _get_config_variables(self) -> Tuple[str, str, str]:
-        """Get the necessary variables from the config file.
+        """Get the necessary variables from the config file. The file is read once.
 
         Returns:
             `Tuple[str, str, str]`: The endpoint, auth token, and revalidate token."""
-        with open("credentials.json", "r") as json_file:
+        if self._credentials is not None:
+            return self._credentials
+
+        with open(self.credentials_path, "r") as json_file:
             credentials = json.load(json_file)
             endpoint = credentials["endpoint"]
             cms_auth_token = credentials["cms_auth_token"]
             revalidate_token = credentials["revalidate_token"]
+            self.revalidate_url = credentials.get("revalidate_url", self.revalidate_url)
 
-        return endpoint, cms_auth_token, revalidate_token
+        self._credentials = (endpoint, cms_auth_token, revalidate_token)
+        return self._credentials
 
-    def _revalidate_endpoint(self, token: str) -> None:
+    def _revalidate_and_save(self, token: str, stats_hash: str) -> None:
+        """Revalidates the endpoint, then saves the hash of the published stats.
+
+        Parameters:
+            `token` (str): The revalidate token.
+            `stats_hash` (str): The hash of the published stats."""
+        self._revalidate_endpoint(token)
+        self._save_published_hash(stats_hash)
+
+    def _revalidate_endpoint(self, token: str) -> Response:
         """Revalidate the endpoint from the NextJS api endpoint.
 
         Parameters:
             `token` (str): The revalidate token."""
-        base_url = "https://mlb-hit-helper.vercel.app/api/revalidate?token="
-        revalidate_token = token
-        response = get(base_url + revalidate_token)
+        response = self._send("revalidate", "GET", self.revalidate_url, params={"token": token})
         print(response.json())
+        return response
 
     def _get_auth_header(self, auth_token: str) -> dict:
         """Get the auth header.
@@ -57,7 +147,7 @@ class CMS:
             "Authorization": f"Bearer {auth_token}",
         }
 
-    def _update_stats(self, endpoint: str, json: List[dict], header: dict) -> None:
+    def _update_stats(self, endpoint: str, json: List[dict], header: dict) -> Response:
         """Update the stats in the CMS via mutation.
 
         Parameters:
@@ -73,10 +163,10 @@ class CMS:
                 }
             }"""
 
-        post(endpoint, json={'query': updateMutation,
-             'variables': {'json': json}}, headers=header)
+        return self._post("updateBatting", endpoint, {'query': updateMutation,
+                          'variables': {'json': json}}, header)
 
-    def _publish_stats(self, endpoint: str, header: dict) -> None:
+    def _publish_stats(self, endpoint: str, header: dict) -> Response:
         """Publish the stats in the CMS via mutation. This is done after
         the stats are updated.
 
@@ -90,4 +180,68 @@ class CMS:
             }
         }"""
 
-        post(endpoint, json={"query": publishMutation}, headers=header)
+        return self._post("publishBatting", endpoint, {"query": publishMutation}, header)
+
+    def _post(self, name: str, endpoint: str, body: dict, header: dict) -> Response:
+        """Posts the body as compact json and records the call.
+
+        Parameters:
+            `name` (str): The name of the call in the summary.
+            `endpoint` (str): The endpoint.
+            `body` (dict): The GraphQL query and variables.
+            `header` (dict): The auth header."""
+        data = self._compact(body).encode("UTF-8")
+        response = self._send(name, "POST", endpoint, data=data,
+                              headers={**header, "Content-Type": "application/json"})
+        errors = response.json().get("errors")
+        if errors:
+            raise RuntimeError(f"{name} failed: {errors}")
+        return response
+
+    def _send(self, name: str, method: str, url: str, **kwargs) -> Response:
+        """Sends a request with retries, records it and raises if it failed.
+
+        Parameters:
+            `name` (str): The name of the call in the summary.
+            `method` (str): The http method.
+            `url` (str): The url.
+            `kwargs`: Passed on to `Session.request`."""
+        def attempt() -> Response:
+            response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            if response.status_code in RETRY_STATUSES:
+                response.raise_for_status()
+            return response
+
+        start = perf_counter()
+        response = with_backoff(attempt, self.attempts)
+        size = len(kwargs["data"]) if "data" in kwargs else len(response.content)
+        seconds = perf_counter() - start
+        self._record(name, size, seconds, response)
+        instrumentation.record(f"cms {name}", "network", seconds, size)
+        response.raise_for_status()
+        return response
+
+    def _record(self, name: str, size: int, seconds: float, response: Response) -> None:
+        """Records and prints the payload size and latency of a call."""
+        self.calls.append((name, size, seconds, response.status_code))
+        print(f"{name}: {size / 1024:.1f} KB in {seconds:.2f}s ({response.status_code})")
+
+    def _compact(self, value) -> str:
+        """Returns the value as json without whitespace."""
+        return json.dumps(value, separators=(",", ":"))
+
+    def _hash(self, batters_json: List[dict]) -> str:
+        """Returns the content hash of the batters json."""
+        return sha256(self._compact(batters_json).encode("UTF-8")).hexdigest()
+
+    def _load_published_hash(self) -> str:
+        """Returns the hash of the last published stats, or None if nothing was published yet."""
+        if not path.exists(self.state_path):
+            return None
+        with open(self.state_path, "r", encoding="UTF-8") as file:
+            return json.load(file).get("hash")
+
+    def _save_published_hash(self, stats_hash: str) -> None:
+        """Saves the hash of the published stats."""
+        with open(self.state_path, "w", encoding="UTF-8") as file:
+            json.dump({"hash": stats_hash, "published_at": datetime.now().isoformat(timespec="seconds")}, file)
@@ -0,0 +1,213 @@
+import json
+import sqlite3
+from datetime import datetime
+from os import path
+from typing import Iterable, Iterator, List, Tuple
+from components.batter import Batter
+from components.batters_game import BattersGame
+from components.json_exporter import JsonExporter
+from components.instrumentation import instrumentation
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    team_code TEXT PRIMARY KEY,
+    team_name TEXT NOT NULL,
+    primary_color TEXT NOT NULL,
+    secondary_color TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS batters (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    team_code TEXT NOT NULL REFERENCES teams (team_code)
+);
+CREATE TABLE IF NOT EXISTS games (
+    batter_id TEXT NOT NULL REFERENCES batters (id),
+    date TEXT NOT NULL,
+    game_number INTEGER NOT NULL,
+    team_played TEXT NOT NULL,
+    hits INTEGER NOT NULL,
+    at_bats INTEGER NOT NULL,
+    PRIMARY KEY (batter_id, date, game_number)
+);
+CREATE TABLE IF NOT EXISTS rankings (
+    day TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    batter_id TEXT NOT NULL REFERENCES batters (id),
+    moving_average REAL NOT NULL,
+    PRIMARY KEY (day, rank)
+);
+CREATE INDEX IF NOT EXISTS games_batter_date ON games (batter_id, date);
+CREATE INDEX IF NOT EXISTS batters_team_code ON batters (team_code);
+"""
+
+
+class Database:
+    """SQLite store for the teams, batters, their games and the daily rankings. Writes are bulk
+    upserts in a single transaction, and the exported batters json is built from the latest ranking.
+    Has the same methods as `GamelogStore` so it can be used as the scrapers' game history."""
+    file_path: str
+    connection: sqlite3.Connection
+
+    def __init__(self, file_path: str = "data/hit_helper.db", teams_path: str = "data/teams_directory.json",
+                 timeout: float = 30):
+        """Parameters:
+            `file_path` (str): The database file. Default is "data/hit_helper.db".
+            `teams_path` (str): The teams directory the teams table is filled from. Default is
+            "data/teams_directory.json".
+            `timeout` (float): Seconds a write waits for another process to release the database,
+            the shard workers share it. Default is 30."""
+        self.file_path = file_path
+        self.connection = sqlite3.connect(file_path, timeout=timeout)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        if path.exists(teams_path):
+            with open(teams_path, "r", encoding="UTF-8") as file:
+                self.upsert_teams(json.load(file))
+
+    def upsert_teams(self, teams: List[dict]) -> None:
+        """Inserts or updates the teams.
+
+        Parameters:
+            `teams` (List[dict]): The teams directory entries."""
+        with self.connection:
+            self._upsert_teams(teams)
+
+    def upsert_batters(self, batters: List[Batter]) -> None:
+        """Inserts or updates the batters, their teams and every game in their game logs, in one transaction.
+
+        Parameters:
+            `batters` (List[Batter]): The batters."""
+        games: List[Tuple] = []
+        for batter in batters:
+            for game in batter.get_all_games():
+                games.append((batter.get_id(), game.get_date(), game.get_game_number(),
+                              game.get_team_played(), game.get_hits(), game.get_at_bats()))
+
+        teams = {batter.get_team_code(): {"team_code": batter.get_team_code(), "team_name": batter.team_name,
+                                          "primary_color": batter.primary_color,
+                                          "secondary_color": batter.secondary_color}
+                 for batter in batters}
+
+        with self.connection:
+            self._upsert_teams(teams.values())
+            self.connection.executemany(
+                """INSERT INTO batters (id, name, team_code) VALUES (?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET name = excluded.name, team_code = excluded.team_code""",
+                [(batter.get_id(), batter.get_name(), batter.get_team_code()) for batter in batters])
+            self.connection.executemany(
+                """INSERT INTO games (batter_id, date, game_number, team_played, hits, at_bats)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (batter_id, date, game_number) DO UPDATE SET team_played = excluded.team_played,
+                hits = excluded.hits, at_bats = excluded.at_bats""",
+                games)
+
+    def save_ranking(self, batters: List[Batter], day: str = None) -> None:
+        """Replaces the ranking of the day with the batters, in order.
+
+        Parameters:
+            `batters` (List[Batter]): The ranked batters.
+            `day` (str): The day of the ranking, YYYY-MM-DD. Default is today."""
+        day = day or datetime.today().strftime("%Y-%m-%d")
+        with self.connection:
+            self.connection.execute("DELETE FROM rankings WHERE day = ?", (day,))
+            self.connection.executemany(
+                "INSERT INTO rankings (day, rank, batter_id, moving_average) VALUES (?, ?, ?, ?)",
+                [(day, rank, batter.get_id(), batter.moving_average) for rank, batter in enumerate(batters)])
+
+    def has(self, id: str) -> bool:
+        """Returns True if there are stored games for the batter.
+
+        Parameters:
+            `id` (str): The batter's id."""
+        return self.last_key(id) is not None
+
+    def get_games(self, id: str, limit: int = -1) -> List[BattersGame]:
+        """Returns the stored games of the batter, newest first.
+
+        Parameters:
+            `id` (str): The batter's id.
+            `limit` (int): The amount of games. Default is all of them."""
+        rows = self.connection.execute(
+            """SELECT date, team_played, hits, at_bats, game_number FROM games WHERE batter_id = ?
+            ORDER BY date DESC, game_number DESC LIMIT ?""", (id, limit)).fetchall()
+        return [BattersGame(row["date"], row["team_played"], row["hits"], row["at_bats"], row["game_number"])
+                for row in rows]
+
+    def last_key(self, id: str) -> Tuple[str, int]:
+        """Returns the key of the newest stored game of the batter, or None if there is none.
+
+        Parameters:
+            `id` (str): The batter's id."""
+        row = self.connection.execute(
+            """SELECT date, game_number FROM games WHERE batter_id = ?
+            ORDER BY date DESC, game_number DESC LIMIT 1""", (id,)).fetchone()
+        return (row["date"], row["game_number"]) if row is not None else None
+
+    def update(self, batters: List[Batter]) -> None:
+        """Stores the game logs of the batters, same as `upsert_batters`.
+
+        Parameters:
+            `batters` (List[Batter]): The batters to store."""
+        self.upsert_batters(batters)
+
+    def export_batters(self, day: str = None, window: int = 10) -> List[dict]:
+        """Builds the batters json of a ranking, in the same shape as `Batter.to_dict`.
+
+        Parameters:
+            `day` (str): The day of the ranking, YYYY-MM-DD. Default is the latest ranking.
+            `window` (int): The amount of games per batter. Default is 10.
+
+        Returns:
+            `List[dict]`: The ranked batters."""
+        return list(self._ranked_batters(day, window))
+
+    @instrumentation.timed("export_json")
+    def export_json(self, file_path: str = "data/batters.json", day: str = None, mode: str = "pretty") -> None:
+        """Writes the batters json of a ranking to a file, one batter at a time.
+
+        Parameters:
+            `file_path` (str): The file to write. Default is "data/batters.json".
+            `day` (str): The day of the ranking, YYYY-MM-DD. Default is the latest ranking.
+            `mode` (str): The `JsonExporter` mode. Default is "pretty".
+            The file is left as it is when there is no ranking to export."""
+        day = day or self._latest_day()
+        if day is None:
+            print(f"No ranking in the database, {file_path} is left as it is")
+            return
+        with JsonExporter(file_path, mode) as exporter:
+            for batter in self._ranked_batters(day):
+                exporter.write(batter)
+
+    def close(self) -> None:
+        """Closes the connection."""
+        self.connection.close()
+
+    def _upsert_teams(self, teams: Iterable[dict]) -> None:
+        """Upserts the teams inside the current transaction."""
+        self.connection.executemany(
+            """INSERT INTO teams (team_code, team_name, primary_color, secondary_color)
+            VALUES (:team_code, :team_name, :primary_color, :secondary_color)
+            ON CONFLICT (team_code) DO UPDATE SET team_name = excluded.team_name,
+            primary_color = excluded.primary_color, secondary_color = excluded.secondary_color""",
+            teams)
+
+    def _latest_day(self) -> str:
+        """Returns the day of the latest ranking, None if there is none."""
+        return self.connection.execute("SELECT MAX(day) AS day FROM rankings").fetchone()["day"]
+
+    def _ranked_batters(self, day: str = None, window: int = 10) -> Iterator[dict]:
+        """Yields the batters of a ranking in order, in the same shape as `Batter.to_dict`."""
+        day = day or self._latest_day()
+        rows = self.connection.execute(
+            """SELECT batters.id, batters.name, teams.team_code, teams.team_name, teams.primary_color,
+            teams.secondary_color, rankings.moving_average FROM rankings
+            JOIN batters ON batters.id = rankings.batter_id
+            JOIN teams ON teams.team_code = batters.team_code
+            WHERE rankings.day = ? ORDER BY rankings.rank""", (day,)).fetchall()
+
+        for row in rows:
+            batter = dict(row)
+            batter["games"] = [game.to_dict() for game in self.get_games(row["id"], window)]
+            yield batter
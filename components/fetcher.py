@@ -0,0 +1,92 @@
+from datetime import datetime
+from time import perf_counter
+from typing import Tuple
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from components.page_cache import PageCache
+from components.instrumentation import instrumentation
+from components.rate_limiter import HostRateLimiter, retry_after_seconds
+
+
+class Fetcher:
+    """HTTP client that fetches server rendered pages without a browser.
+    Connections are pooled and kept alive between requests, and pages are served from
+    the page cache while they are fresh."""
+    session: Session
+    timeout: Tuple[float, float]
+    cache: PageCache
+    rate_limiter: HostRateLimiter
+
+    def __init__(self, pool_size: int = 10, timeout: Tuple[float, float] = (5, 30),
+                 cache: PageCache = None, rate_limiter: HostRateLimiter = None):
+        """Parameters:
+            `pool_size` (int): The number of connections kept open per host. Default is 10.
+            `timeout` (Tuple[float, float]): The connect and read timeouts in seconds. Default is (5, 30).
+            `cache` (PageCache): The page cache. Default is None, pages are always fetched.
+            `rate_limiter` (HostRateLimiter): Paces the requests per host, pages served from the
+            cache do not wait for it. Default is None."""
+        self.timeout = timeout
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.session = Session()
+        self.session.headers.update({
+            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko)",
+        })
+        retries = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get_html(self, url: str, expires_at: datetime = None) -> str:
+        """Fetches the html of the url. A fresh cached page is returned without a request,
+        a stale one is revalidated with its ETag/Last-Modified.
+
+        Parameters:
+            `url` (str): URL to be fetched.
+            `expires_at` (datetime): When the cached page expires. Default is the cache ttl of the url.
+
+        Returns:
+            `str`: The html of the page."""
+        if self.cache is None:
+            response = self._request(url)
+            response.raise_for_status()
+            return response.text
+
+        entry = self.cache.get(url)
+        if entry is not None and self.cache.is_fresh(entry):
+            html = self.cache.read(url)
+            if html is not None:
+                return html
+
+        headers = self.cache.validators(entry)
+        response = self._request(url, headers)
+        if response.status_code == 304:
+            self.cache.refresh(url, expires_at)
+            html = self.cache.read(url)
+            if html is not None:
+                return html
+            response = self._request(url)
+        response.raise_for_status()
+        self.cache.put(url, response.text, response.headers.get("ETag"),
+                       response.headers.get("Last-Modified"), expires_at)
+        return response.text
+
+    def close(self) -> None:
+        """Closes the pooled connections and saves the page cache."""
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def _request(self, url: str, headers: dict = None) -> Response:
+        """Sends a GET request, paced by the rate limiter, and records it as a network stage."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(url)
+        start = perf_counter()
+        with instrumentation.stage("fetch", "network") as stage:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            stage["bytes"] = len(response.content)
+        if self.rate_limiter is not None:
+            self.rate_limiter.feedback(url, response.status_code, perf_counter() - start,
+                                       retry_after_seconds(response.headers.get("Retry-After")))
+        return response
@@ -0,0 +1,81 @@
+from array import array
+from datetime import date
+from typing import Dict, List, Tuple
+from components.batters_game import BattersGame
+
+_opponents: List[str] = []
+_opponent_index: Dict[str, int] = {}
+
+
+def _intern_opponent(team_played: str) -> int:
+    """Returns the index of the opponent code, adding it to the shared table if it is new."""
+    index = _opponent_index.get(team_played)
+    if index is None:
+        index = len(_opponents)
+        _opponents.append(team_played)
+        _opponent_index[team_played] = index
+    return index
+
+
+class GameLog:
+    """Columnar game history of a batter, oldest game first. Dates are kept as ordinals,
+    opponents as indexes into a table of interned codes shared by every log, and hits and
+    at bats as 16 bit ints, so a full season is a few kilobytes instead of 162 objects."""
+    __slots__ = ("dates", "game_numbers", "opponents", "hits", "at_bats")
+    dates: array
+    game_numbers: array
+    opponents: array
+    hits: array
+    at_bats: array
+
+    def __init__(self):
+        self.dates = array("i")
+        self.game_numbers = array("b")
+        self.opponents = array("H")
+        self.hits = array("h")
+        self.at_bats = array("h")
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def append(self, game: BattersGame) -> None:
+        """Adds a game newer than every game in the log.
+
+        Parameters:
+            `game` (BattersGame): The game to add."""
+        self.dates.append(date.fromisoformat(game.get_date()).toordinal())
+        self.game_numbers.append(game.get_game_number())
+        self.opponents.append(_intern_opponent(game.get_team_played()))
+        self.hits.append(game.get_hits())
+        self.at_bats.append(game.get_at_bats())
+
+    def game(self, index: int) -> BattersGame:
+        """Returns the game at the index, counted from the newest game.
+
+        Parameters:
+            `index` (int): 0 for the newest game."""
+        position = len(self.dates) - 1 - index
+        return BattersGame(date.fromordinal(self.dates[position]).isoformat(),
+                           _opponents[self.opponents[position]], self.hits[position],
+                           self.at_bats[position], self.game_numbers[position])
+
+    def newest(self, count: int = None) -> List[BattersGame]:
+        """Returns the newest games, newest first.
+
+        Parameters:
+            `count` (int): The amount of games. Default is all of them."""
+        amount = len(self.dates) if count is None else min(count, len(self.dates))
+        return [self.game(index) for index in range(amount)]
+
+    def hits_at(self, index: int) -> int:
+        """Returns the hits of the game at the index, counted from the newest game.
+
+        Parameters:
+            `index` (int): 0 for the newest game."""
+        return self.hits[len(self.hits) - 1 - index]
+
+    def last_key(self) -> Tuple[str, int]:
+        """Returns the date and game of the day of the newest game, or None if the log is empty."""
+        if not self.dates:
+            return None
+        return (date.fromordinal(self.dates[-1]).isoformat(), self.game_numbers[-1])
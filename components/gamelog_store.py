@@ -0,0 +1,93 @@
+import json
+from os import path
+from typing import Dict, List, Tuple
+from components.batter import Batter
+from components.batters_game import BattersGame
+
+
+class GamelogStore:
+    """Per-batter game history kept between runs, keyed by date plus the game of the day.
+    The first run seeds it from the last exported `data/batters.json`."""
+    file_path: str
+    _games: Dict[str, List[BattersGame]]
+
+    def __init__(self, file_path: str = "data/gamelogs.json", seed_path: str = "data/batters.json"):
+        """Parameters:
+            `file_path` (str): The file the history is kept in. Default is "data/gamelogs.json".
+            `seed_path` (str): The export to seed the history from when there is none yet.
+            Default is "data/batters.json"."""
+        self.file_path = file_path
+        if path.exists(file_path):
+            self._games = self._load()
+        elif path.exists(seed_path):
+            self._games = self._seed(seed_path)
+        else:
+            self._games = {}
+
+    def has(self, id: str) -> bool:
+        """Returns True if there are stored games for the batter.
+
+        Parameters:
+            `id` (str): The batter's id."""
+        return bool(self._games.get(id))
+
+    def get_games(self, id: str) -> List[BattersGame]:
+        """Returns the stored games of the batter, newest first.
+
+        Parameters:
+            `id` (str): The batter's id."""
+        return list(self._games.get(id, []))
+
+    def last_key(self, id: str) -> Tuple[str, int]:
+        """Returns the key of the newest stored game of the batter, or None if there is none.
+
+        Parameters:
+            `id` (str): The batter's id."""
+        games = self._games.get(id)
+        return games[0].get_key() if games else None
+
+    def update(self, batters: List[Batter]) -> None:
+        """Merges the game logs of the batters into the stored games by date and game of the day,
+        like the database upsert, and saves the history. A shorter game log, such as the box score
+        window of a league run, keeps the older stored games.
+
+        Parameters:
+            `batters` (List[Batter]): The batters to store."""
+        for batter in batters:
+            games = {game.get_key(): game for game in self._games.get(batter.get_id(), [])}
+            games.update((game.get_key(), game) for game in batter.get_all_games())
+            self._games[batter.get_id()] = sorted(games.values(), key=lambda game: game.get_key(), reverse=True)
+        self._save()
+
+    def _load(self) -> Dict[str, List[BattersGame]]:
+        """Loads the stored history."""
+        with open(self.file_path, "r", encoding="UTF-8") as file:
+            stored: Dict[str, List[dict]] = json.load(file)
+
+        return {id: [BattersGame(game["date"], game["team_played"], game["hits"],
+                                 game["at_bats"], game["game_number"]) for game in games]
+                for id, games in stored.items()}
+
+    def _seed(self, seed_path: str) -> Dict[str, List[BattersGame]]:
+        """Builds the history from an export. The export has no doubleheader index, games are
+        newest first so the first of two games on the same date is the second game of the day."""
+        with open(seed_path, "r", encoding="UTF-8") as file:
+            exported: List[dict] = json.load(file)
+
+        history: Dict[str, List[BattersGame]] = {}
+        for batter in exported:
+            dates = [game["date"] for game in batter["games"]]
+            games: List[BattersGame] = []
+            for index, game in enumerate(batter["games"]):
+                game_number = dates[index:].count(game["date"])
+                games.append(BattersGame(game["date"], game["team_played"], game["hits"],
+                                         game["at_bats"], game_number))
+            history[batter["id"]] = games
+        return history
+
+    def _save(self) -> None:
+        """Saves the history."""
+        stored = {id: [dict(game.to_dict(), game_number=game.get_game_number()) for game in games]
+                  for id, games in self._games.items()}
+        with open(self.file_path, "w", encoding="UTF-8") as file:
+            json.dump(stored, file)
@@ -0,0 +1,183 @@
+import json
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from os import getpid, listdir
+from threading import Lock
+from time import perf_counter
+from typing import IO, Callable, Dict, Iterator, List, TypeVar
+try:
+    import resource
+except ImportError:
+    resource = None
+
+T = TypeVar("T")
+KINDS = ("network", "sleep", "cpu")
+# Reading the browser RSS walks all of /proc, it is sampled at most this often
+RSS_SAMPLE_SECONDS = 5
+
+
+class Instrumentation:
+    """Records the stages of a run: wall time, whether the time went to the network, to sleeping
+    or to work, bytes transferred, and the peak RSS of python and of the browser processes.
+    Every stage is written as a json line as soon as it ends, `summary` totals them per stage."""
+    file: IO
+    records: List[dict]
+    browser_peak_kb: int
+    _sampled_at: float
+    _lock: Lock
+
+    def __init__(self):
+        self.file = None
+        self.records = []
+        self.browser_peak_kb = 0
+        self._sampled_at = None
+        self._lock = Lock()
+
+    def start(self, file_path: str) -> None:
+        """Starts writing the stages to a json lines file.
+
+        Parameters:
+            `file_path` (str): The file to write to, appended to if it exists."""
+        self.file = open(file_path, "a", encoding="UTF-8")
+
+    def stop(self) -> None:
+        """Stops writing the stages."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    @contextmanager
+    def stage(self, name: str, kind: str = "cpu") -> Iterator[dict]:
+        """Records the stage run inside the block. The block can set "bytes" on the yielded dict.
+
+        Parameters:
+            `name` (str): The name of the stage.
+            `kind` (str): What the stage waits on, "network", "sleep" or "cpu". Default is "cpu"."""
+        record = {"bytes": 0}
+        start = perf_counter()
+        try:
+            yield record
+        finally:
+            self.record(name, kind, perf_counter() - start, record["bytes"])
+
+    def reset(self) -> None:
+        """Forgets the recorded stages and the browser peak."""
+        with self._lock:
+            self.records = []
+            self.browser_peak_kb = 0
+            self._sampled_at = None
+
+    def record(self, name: str, kind: str, seconds: float, size: int = 0) -> None:
+        """Records a stage that was timed elsewhere. The browser RSS is sampled after network stages,
+        at most once every `RSS_SAMPLE_SECONDS`.
+
+        Parameters:
+            `name` (str): The name of the stage.
+            `kind` (str): What the stage waited on, "network", "sleep" or "cpu".
+            `seconds` (float): How long the stage took.
+            `size` (int): The bytes transferred. Default is 0."""
+        with self._lock:
+            if kind == "network" and (self._sampled_at is None
+                                      or perf_counter() - self._sampled_at >= RSS_SAMPLE_SECONDS):
+                self._sampled_at = perf_counter()
+                self.browser_peak_kb = max(self.browser_peak_kb, _children_rss_kb())
+            self._write({
+                "stage": name,
+                "kind": kind,
+                "at": datetime.now().isoformat(timespec="milliseconds"),
+                "seconds": round(seconds, 4),
+                "bytes": size,
+                "python_peak_kb": python_peak_kb(),
+                "browser_peak_kb": self.browser_peak_kb,
+            })
+
+    def timed(self, name: str, kind: str = "cpu") -> Callable[[Callable[..., T]], Callable[..., T]]:
+        """Decorator that records every call of the function as a stage.
+
+        Parameters:
+            `name` (str): The name of the stage.
+            `kind` (str): What the stage waits on, "network", "sleep" or "cpu". Default is "cpu"."""
+        def decorator(function: Callable[..., T]) -> Callable[..., T]:
+            @wraps(function)
+            def wrapper(*args, **kwargs) -> T:
+                with self.stage(name, kind):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def totals(self) -> Dict[str, List[float]]:
+        """Returns the calls, seconds and bytes of every stage, keyed by stage."""
+        stages: Dict[str, List[float]] = {}
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            totals = stages.setdefault(record["stage"], [0, 0, 0])
+            totals[0] += 1
+            totals[1] += record["seconds"]
+            totals[2] += record["bytes"]
+        return stages
+
+    def summary(self) -> str:
+        """Returns the calls, seconds and bytes of every stage, and the time per kind."""
+        kinds: Dict[str, float] = {kind: 0 for kind in KINDS}
+        with self._lock:
+            for record in self.records:
+                kinds[record["kind"]] = kinds.get(record["kind"], 0) + record["seconds"]
+
+        python_peak = python_peak_kb()
+        lines = [f"{name}: {calls}x {seconds:.1f}s {size / 1024:.0f} KB"
+                 for name, (calls, seconds, size) in sorted(self.totals().items(), key=lambda item: -item[1][1])]
+        lines.append(", ".join(f"{kind} {seconds:.1f}s" for kind, seconds in kinds.items()))
+        lines.append(f"peak RSS python {python_peak / 1024:.0f} MB, browser {self.browser_peak_kb / 1024:.0f} MB")
+        return "\n".join(lines)
+
+    def _write(self, record: dict) -> None:
+        """Keeps the record and writes it to the json lines file, under the lock."""
+        self.records.append(record)
+        if self.file is not None:
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+
+
+def python_peak_kb() -> int:
+    """Returns the peak RSS of this process, 0 where the resource module is missing."""
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _children_rss_kb() -> int:
+    """Returns the summed RSS of every process descending from this one, read from /proc.
+    That is the Playwright driver and the browser it launched. 0 where there is no /proc."""
+    try:
+        pids = [entry for entry in listdir("/proc") if entry.isdigit()]
+    except OSError:
+        return 0
+
+    children: Dict[int, List[int]] = {}
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", "r") as file:
+                parent = int(file.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(pid))
+
+    total = 0
+    pending = list(children.get(getpid(), []))
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status", "r") as file:
+                for line in file:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return total
+
+
+instrumentation = Instrumentation()
@@ -0,0 +1,101 @@
+import json
+from os import remove, replace
+from os.path import splitext
+from textwrap import indent
+from typing import IO, Iterable
+from components.batter import Batter
+from components.instrumentation import instrumentation
+
+MODES = ("pretty", "compact", "ndjson")
+
+
+class JsonExporter:
+    """Writes batters to a json file one at a time, so the list of dicts is never built in
+    memory. The batters go to a `.part` file next to the target that is renamed over it when
+    the export is closed, readers of the target never see a half-written file.
+
+    Modes:
+        `pretty`: A json array indented by 2, the same bytes as `json.dump(..., indent=2)`.
+        `compact`: A json array without whitespace.
+        `ndjson`: One batter per line, the `.part` file can be tailed while it is written. It goes to
+        the `.ndjson` file next to the target, readers of the json file such as `GamelogStore`
+        expect an array."""
+    file_path: str
+    mode: str
+    part_path: str
+    _file: IO
+    _count: int
+
+    def __init__(self, file_path: str = "data/batters.json", mode: str = "pretty"):
+        """Parameters:
+            `file_path` (str): The file to export to. Default is "data/batters.json".
+            `mode` (str): "pretty", "compact" or "ndjson". Default is "pretty"."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown export mode {mode}, expected one of {', '.join(MODES)}")
+        if mode == "ndjson":
+            file_path = splitext(file_path)[0] + ".ndjson"
+        self.file_path = file_path
+        self.mode = mode
+        self.part_path = file_path + ".part"
+        self._file = None
+        self._count = 0
+
+    def __enter__(self) -> "JsonExporter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def open(self) -> None:
+        """Starts the export."""
+        self._file = open(self.part_path, "w", encoding="UTF-8")
+        self._count = 0
+        if self.mode != "ndjson":
+            self._file.write("[")
+
+    def write(self, batter: dict) -> None:
+        """Writes a batter and flushes it to the `.part` file.
+
+        Parameters:
+            `batter` (dict): The batter, as returned by `Batter.to_dict`."""
+        separator = "," if self._count > 0 else ""
+        if self.mode == "pretty":
+            self._file.write(separator + "\n" + indent(json.dumps(batter, indent=2), "  "))
+        elif self.mode == "compact":
+            self._file.write(separator + json.dumps(batter, separators=(",", ":")))
+        else:
+            self._file.write(json.dumps(batter, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self._count += 1
+
+    def close(self) -> None:
+        """Finishes the export and renames the `.part` file over the target."""
+        if self.mode == "pretty":
+            self._file.write("\n]" if self._count > 0 else "]")
+        elif self.mode == "compact":
+            self._file.write("]")
+        self._file.close()
+        replace(self.part_path, self.file_path)
+
+
+    def discard(self) -> None:
+        """Abandons the export, the `.part` file is removed and the target is left as it is."""
+        self._file.close()
+        remove(self.part_path)
+
+
+@instrumentation.timed("export_json")
+def export_batters(batters: Iterable[Batter], file_path: str = "data/batters.json", mode: str = "pretty") -> None:
+    """Exports the batters to a json file, one batter at a time.
+
+    Parameters:
+        `batters` (Iterable[Batter]): The batters to export.
+        `file_path` (str): The file to export to. Default is "data/batters.json".
+        `mode` (str): "pretty", "compact" or "ndjson". Default is "pretty"."""
+    with JsonExporter(file_path, mode) as exporter:
+        for batter in batters:
+            exporter.write(batter.to_dict())
@@ -7,6 +7,11 @@ class Logger:
     start: str = ""
     exception: str = "No Exceptions were raised."
     end: str = ""
+    waits: str = ""
+    requests: str = ""
+    cms: str = ""
+    rates: str = ""
+    stages: str = ""
 
     def __init__(self):
         self._create_log_folder()
@@ -19,6 +24,41 @@ class Logger:
         """Reports an exception and its traceback."""
         self.exception = traceback.format_exc()
 
+    def report_waits(self, summary: str) -> None:
+        """Reports how long the page waits took.
+
+        Parameters:
+            `summary` (str): The summary of the waits."""
+        self.waits = f"Waits: {summary}"
+
+    def report_requests(self, summary: str) -> None:
+        """Reports how many browser requests were blocked and allowed.
+
+        Parameters:
+            `summary` (str): The summary of the requests."""
+        self.requests = f"Requests: {summary}"
+
+    def report_cms(self, summary: str) -> None:
+        """Reports the size and latency of the CMS calls.
+
+        Parameters:
+            `summary` (str): The summary of the CMS calls."""
+        self.cms = f"CMS: {summary}"
+
+    def report_rates(self, summary: str) -> None:
+        """Reports the requests, rates and queue waits of every host.
+
+        Parameters:
+            `summary` (str): The summary of the rate limiter."""
+        self.rates = f"Rates:\n{summary}"
+
+    def report_stages(self, summary: str) -> None:
+        """Reports the time, bytes and memory of every stage.
+
+        Parameters:
+            `summary` (str): The summary of the stages."""
+        self.stages = f"Stages:\n{summary}"
+
     def report_end(self) -> None:
         """Reports the end of the program."""
         self.end = f"Ended at {self._today()}"
@@ -28,10 +68,24 @@ class Logger:
         with open(f"logs/{self._get_date_name()}.txt", "w") as f:
             f.write(self.start + "\n")
             f.write(self.exception + "\n")
+            if self.waits:
+                f.write(self.waits + "\n")
+            if self.requests:
+                f.write(self.requests + "\n")
+            if self.cms:
+                f.write(self.cms + "\n")
+            if self.rates:
+                f.write(self.rates + "\n")
+            if self.stages:
+                f.write(self.stages + "\n")
             f.write(self.end)
 
         print("Report created.")
 
+    def get_stages_path(self) -> str:
+        """Returns the json lines file the stages of today's run are written to."""
+        return f"logs/{self._get_date_name()}_stages.jsonl"
+
     def _delete_previous_logs(self):
         """Deletes the previous logs."""
         for file in listdir("logs"):
@@ -0,0 +1,180 @@
+import json
+import re
+from datetime import datetime, timedelta
+from hashlib import sha1
+from os import path, makedirs, remove, replace
+from threading import Lock
+from time import time
+from typing import Dict, List, Tuple
+
+DEFAULT_TTLS = [
+    (r"/teams/[A-Z]{3}/\d{4}\.shtml", 24 * 60 * 60),
+    (r"/players/gl\.fcgi", 6 * 60 * 60),
+    (r"/boxes/\?", 6 * 60 * 60),
+    (r"/boxes/[A-Z]{3}/[A-Z]{3}\d{9}\.shtml", 30 * 24 * 60 * 60),
+]
+
+
+class PageCache:
+    """On-disk cache of fetched pages keyed by url. Entries expire after the ttl of the first
+    url pattern they match, or at an explicit expiry given when they are stored. Expired entries
+    keep their ETag/Last-Modified so they can be revalidated, and the least recently used
+    entries are evicted once the cache grows past `max_bytes`. A hit only marks the index as
+    changed, it is saved with the next stored page or on `close`."""
+    directory: str
+    max_bytes: int
+    ttls: List[Tuple[str, int]]
+    _index: Dict[str, dict]
+    _is_dirty: bool
+    _lock: Lock
+
+    def __init__(self, directory: str = "cache", max_bytes: int = 200 * 1024 * 1024,
+                 ttls: List[Tuple[str, int]] = DEFAULT_TTLS):
+        """Parameters:
+            `directory` (str): The folder the pages are stored in. Default is "cache".
+            `max_bytes` (int): The size the cache is trimmed down to. Default is 200 MB.
+            `ttls` (List[Tuple[str, int]]): Url patterns and how many seconds their pages are kept."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttls = ttls
+        self._lock = Lock()
+        if not path.exists(directory):
+            makedirs(directory)
+        self._index = self._load_index()
+        self._is_dirty = False
+
+    def get(self, url: str) -> dict:
+        """Returns the cache entry of the url, or None if it was never stored.
+
+        Parameters:
+            `url` (str): The url of the page."""
+        with self._lock:
+            return self._index.get(url)
+
+    def is_fresh(self, entry: dict) -> bool:
+        """Returns True if the entry has not expired.
+
+        Parameters:
+            `entry` (dict): The cache entry."""
+        return entry["expires_at"] > time()
+
+    def validators(self, entry: dict) -> dict:
+        """Returns the conditional request headers to revalidate the entry.
+
+        Parameters:
+            `entry` (dict): The cache entry, can be None."""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def read(self, url: str) -> str:
+        """Reads the stored page of the url and marks it as recently used.
+
+        Parameters:
+            `url` (str): The url of the page.
+
+        Returns:
+            `str`: The html of the page, or None if it was evicted."""
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:
+                return None
+            entry["accessed_at"] = time()
+            self._is_dirty = True
+        try:
+            with open(self._page_path(url), "r", encoding="UTF-8") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, url: str, html: str, etag: str = None, last_modified: str = None,
+            expires_at: datetime = None) -> None:
+        """Stores the page of the url.
+
+        Parameters:
+            `url` (str): The url of the page.
+            `html` (str): The html of the page.
+            `etag` (str): The ETag header of the response. Default is None.
+            `last_modified` (str): The Last-Modified header of the response. Default is None.
+            `expires_at` (datetime): When the page expires. Default is the ttl of the url."""
+        with open(self._page_path(url), "w", encoding="UTF-8") as file:
+            file.write(html)
+        with self._lock:
+            self._index[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "size": len(html.encode("UTF-8")),
+                "accessed_at": time(),
+                "expires_at": self._expiry(url, expires_at),
+            }
+            self._evict()
+            self._save_index()
+
+    def refresh(self, url: str, expires_at: datetime = None) -> None:
+        """Extends the expiry of a stored page after it was revalidated.
+
+        Parameters:
+            `url` (str): The url of the page.
+            `expires_at` (datetime): When the page expires. Default is the ttl of the url."""
+        with self._lock:
+            if url in self._index:
+                self._index[url]["expires_at"] = self._expiry(url, expires_at)
+                self._save_index()
+
+    def close(self) -> None:
+        """Saves the index if pages were read since it was last saved."""
+        with self._lock:
+            if self._is_dirty:
+                self._save_index()
+
+    def _expiry(self, url: str, expires_at: datetime) -> float:
+        """Returns the expiry timestamp of the url."""
+        if expires_at is not None:
+            return expires_at.timestamp()
+        for pattern, seconds in self.ttls:
+            if re.search(pattern, url):
+                return (datetime.now() + timedelta(seconds=seconds)).timestamp()
+        return time()
+
+    def _evict(self) -> None:
+        """Removes the least recently used pages until the cache fits in `max_bytes`."""
+        total = sum(entry["size"] for entry in self._index.values())
+        by_access = sorted(self._index.items(), key=lambda item: item[1]["accessed_at"])
+        for url, entry in by_access:
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            del self._index[url]
+            if path.exists(self._page_path(url)):
+                remove(self._page_path(url))
+
+    def _page_path(self, url: str) -> str:
+        """Returns the file path the page of the url is stored at."""
+        return path.join(self.directory, sha1(url.encode("UTF-8")).hexdigest() + ".html")
+
+    def _load_index(self) -> Dict[str, dict]:
+        """Loads the index of stored pages. An unreadable index is treated as an empty cache,
+        its pages are fetched again."""
+        index_path = path.join(self.directory, "index.json")
+        if not path.exists(index_path):
+            return {}
+        try:
+            with open(index_path, "r", encoding="UTF-8") as file:
+                return json.load(file)
+        except ValueError:
+            print(f"The page cache index {index_path} is corrupt, starting with an empty cache")
+            return {}
+
+    def _save_index(self) -> None:
+        """Saves the index of stored pages. The index is written next to its final path and moved
+        over it, an interrupted write never leaves half an index."""
+        index_path = path.join(self.directory, "index.json")
+        with open(index_path + ".part", "w", encoding="UTF-8") as file:
+            json.dump(self._index, file)
+        replace(index_path + ".part", index_path)
+        self._is_dirty = False
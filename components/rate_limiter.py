@@ -0,0 +1,222 @@
+from asyncio import sleep as async_sleep
+from threading import Lock
+from time import monotonic, sleep
+from typing import Dict, List
+from urllib.parse import urlparse
+from components.instrumentation import instrumentation
+
+THROTTLE_STATUSES = [429, 503]
+
+
+class HostRateLimiter:
+    """Spaces out the requests to each host by a minimum interval, shared by every page,
+    thread or task that asks it. A request reserves the next free slot of its host and
+    sleeps until then, so parallel workers queue up instead of hitting the host at once."""
+    interval: float
+    intervals: Dict[str, float]
+    _next_slots: Dict[str, float]
+    _lock: Lock
+
+    def __init__(self, interval: float = 1, intervals: Dict[str, float] = None):
+        """Parameters:
+            `interval` (float): The least seconds between two requests to the same host. Default is 1.
+            `intervals` (Dict[str, float]): Intervals of specific hosts, keyed by host. Default is None."""
+        self.interval = interval
+        self.intervals = intervals or {}
+        self._next_slots = {}
+        self._lock = Lock()
+
+    def wait(self, url: str) -> float:
+        """Sleeps until the host of the url can be requested again.
+
+        Parameters:
+            `url` (str): The url about to be requested.
+
+        Returns:
+            `float`: The seconds slept."""
+        delay = self._reserve(url)
+        if delay > 0:
+            with instrumentation.stage("rate_limit", "sleep"):
+                sleep(delay)
+        return delay
+
+    async def wait_async(self, url: str) -> float:
+        """Async version of `wait`, other tasks run while it sleeps.
+
+        Parameters:
+            `url` (str): The url about to be requested.
+
+        Returns:
+            `float`: The seconds slept."""
+        delay = self._reserve(url)
+        if delay > 0:
+            with instrumentation.stage("rate_limit", "sleep"):
+                await async_sleep(delay)
+        return delay
+
+    def feedback(self, url: str, status: int, seconds: float, retry_after: float = None) -> None:
+        """Tells the limiter how a request went. The fixed interval ignores it.
+
+        Parameters:
+            `url` (str): The url that was requested.
+            `status` (int): The status code of the response, 0 if there was none.
+            `seconds` (float): How long the response took.
+            `retry_after` (float): The seconds of the Retry-After header. Default is None."""
+
+    def summary(self) -> str:
+        """Returns the rate of every host, empty for the fixed interval."""
+        return ""
+
+    def _reserve(self, url: str) -> float:
+        """Takes the next free slot of the host and returns the seconds until it."""
+        host = urlparse(url).hostname or ""
+        interval = self.intervals.get(host, self.interval)
+        with self._lock:
+            now = monotonic()
+            slot = max(now, self._next_slots.get(host, now))
+            self._next_slots[host] = slot + interval
+        return slot - now
+
+
+def retry_after_seconds(value: str) -> float:
+    """Returns the seconds of a Retry-After header, None if it is missing or a date."""
+    if value is None or not value.strip().isdigit():
+        return None
+    return float(value.strip())
+
+
+class HostBucket:
+    """The token bucket of a host in `AdaptiveRateLimiter`: its current rate in requests per
+    second, the tokens left and until when the host is held after a throttle. It also counts
+    the requests, the seconds waited and the throttles for the summary."""
+    __slots__ = ("rate", "tokens", "updated", "blocked_until", "requests", "waited",
+                 "throttled", "first_request", "last_request")
+    rate: float
+    tokens: float
+    updated: float
+    blocked_until: float
+    requests: int
+    waited: float
+    throttled: int
+    first_request: float
+    last_request: float
+
+    def __init__(self, rate: float, tokens: float, now: float):
+        """Parameters:
+            `rate` (float): The starting requests per second.
+            `tokens` (float): The starting tokens, the burst allowed before the rate applies.
+            `now` (float): The monotonic time the bucket is created at."""
+        self.rate = rate
+        self.tokens = tokens
+        self.updated = now
+        self.blocked_until = now
+        self.requests = 0
+        self.waited = 0.0
+        self.throttled = 0
+        self.first_request = now
+        self.last_request = now
+
+    def achieved_rate(self) -> float:
+        """Returns the requests per second from the first request to the last."""
+        elapsed = self.last_request - self.first_request
+        return self.requests / elapsed if elapsed > 0 else float(self.requests)
+
+
+class AdaptiveRateLimiter(HostRateLimiter):
+    """Token bucket per host whose rate follows the host. Every response that comes back
+    fast adds `increase` requests per second up to the highest rate of the host. A slow response takes 10% off
+    the rate. A 429 or 503 halves the rate, empties the bucket and holds the host for its
+    Retry-After. The starting rate of a host is one request per `interval`."""
+    min_rate: float
+    max_rate: float
+    max_rates: Dict[str, float]
+    burst: float
+    increase: float
+    target_latency: float
+    _buckets: Dict[str, HostBucket]
+
+    def __init__(self, interval: float = 1, intervals: Dict[str, float] = None, min_rate: float = 0.1,
+                 max_rate: float = 4, burst: float = 2, increase: float = 0.05, target_latency: float = 3,
+                 max_rates: Dict[str, float] = None):
+        """Parameters:
+            `interval` (float): The seconds between two requests to a host at the start. Default is 1.
+            `intervals` (Dict[str, float]): Starting intervals of specific hosts, keyed by host. Default is None.
+            `min_rate` (float): The least requests per second a host is slowed down to. Default is 0.1.
+            `max_rate` (float): The most requests per second a host that is not in `max_rates` is sped
+            up to. Default is 4.
+            `burst` (float): The requests a host can get at once after being idle. Default is 2.
+            `increase` (float): Requests per second added after every fast response. Default is 0.05.
+            `target_latency` (float): Seconds above which a response counts as slow. Default is 3.
+            `max_rates` (Dict[str, float]): The most requests per second of specific hosts, keyed by host,
+            for hosts that ban before they slow down. Default is None."""
+        super().__init__(interval, intervals)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_rates = max_rates or {}
+        self.burst = burst
+        self.increase = increase
+        self.target_latency = target_latency
+        self._buckets = {}
+
+    def feedback(self, url: str, status: int, seconds: float, retry_after: float = None) -> None:
+        """Adapts the rate of the host to how the request went.
+
+        Parameters:
+            `url` (str): The url that was requested.
+            `status` (int): The status code of the response, 0 if there was none.
+            `seconds` (float): How long the response took.
+            `retry_after` (float): The seconds of the Retry-After header. Default is None."""
+        host = urlparse(url).hostname or ""
+        with self._lock:
+            now = monotonic()
+            bucket = self._bucket(host, now)
+            if status in THROTTLE_STATUSES:
+                bucket.throttled += 1
+                bucket.rate = max(self.min_rate, bucket.rate / 2)
+                bucket.tokens = min(bucket.tokens, 0)
+                hold = retry_after if retry_after is not None else 1 / bucket.rate
+                bucket.blocked_until = max(bucket.blocked_until, now + hold)
+            elif seconds > self.target_latency:
+                bucket.rate = max(self.min_rate, bucket.rate * 0.9)
+            else:
+                bucket.rate = min(self._max_rate(host), bucket.rate + self.increase)
+
+    def summary(self) -> str:
+        """Returns the requests, achieved and current rate, queue wait and throttled responses of every host."""
+        with self._lock:
+            buckets = sorted(self._buckets.items())
+        lines: List[str] = []
+        for host, bucket in buckets:
+            average_wait = bucket.waited / bucket.requests if bucket.requests else 0
+            lines.append(f"{host}: {bucket.requests} requests at {bucket.achieved_rate():.2f}/s, "
+                         f"rate now {bucket.rate:.2f}/s, waited {bucket.waited:.1f}s in queue "
+                         f"({average_wait:.2f}s avg), {bucket.throttled} throttled")
+        return "\n".join(lines) if lines else "no requests"
+
+    def _reserve(self, url: str) -> float:
+        """Takes a token of the host and returns the seconds until it is available."""
+        host = urlparse(url).hostname or ""
+        with self._lock:
+            now = monotonic()
+            bucket = self._bucket(host, now)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+            bucket.tokens -= 1
+            delay = max(0.0, -bucket.tokens / bucket.rate, bucket.blocked_until - now)
+            if bucket.requests == 0:
+                bucket.first_request = now + delay
+            bucket.requests += 1
+            bucket.waited += delay
+            bucket.last_request = max(bucket.last_request, now + delay)
+        return delay
+
+    def _max_rate(self, host: str) -> float:
+        """Returns the most requests per second of the host."""
+        return self.max_rates.get(host, self.max_rate)
+
+    def _bucket(self, host: str, now: float) -> HostBucket:
+        """Returns the bucket of the host, created full at the starting rate, never above its highest rate."""
+        if host not in self._buckets:
+            rate = min(1 / self.intervals.get(host, self.interval), self._max_rate(host))
+            self._buckets[host] = HostBucket(rate, self.burst, now)
+        return self._buckets[host]
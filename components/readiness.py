@@ -0,0 +1,140 @@
+from time import perf_counter
+from typing import List, Tuple
+from playwright.sync_api import Page, ElementHandle
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from components.instrumentation import instrumentation
+
+TABLE_READY = """([selector, minRows]) => {
+    const table = document.querySelector(selector);
+    return table !== null && table.querySelectorAll("tbody tr").length >= minRows;
+}"""
+
+TABLE_SORTED = """([selector, stat, descending]) => {
+    const table = document.querySelector(selector);
+    if (table === null) return false;
+    const values = [...table.querySelectorAll(`tbody tr:not(.thead) [data-stat='${stat}']`)]
+        .map(cell => cell.getAttribute("csk") || cell.innerText.trim())
+        .filter(value => value !== "")
+        .map(value => isNaN(Number(value)) ? value : Number(value));
+    for (let i = 1; i < values.length; i++) {
+        if (descending ? values[i - 1] < values[i] : values[i - 1] > values[i]) return false;
+    }
+    return values.length > 0;
+}"""
+
+
+class Readiness:
+    """Waits on concrete page conditions instead of fixed sleeps. Every wait is bounded
+    by a timeout and its duration is recorded next to the fixed sleep it replaced.
+    Waits on elements the scrapers need raise on timeout, the sort and network waits do not."""
+    timeout: int
+    idle_timeout: int
+    timings: List[Tuple[str, float, float, bool]]
+
+    def __init__(self, timeout: int = 30000, idle_timeout: int = 5000):
+        """Parameters:
+            `timeout` (int): Milliseconds to wait for a table or a sort. Default is 30000.
+            `idle_timeout` (int): Milliseconds to wait for the network to go quiet. Default is 5000."""
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.timings = []
+
+    def wait_for_selector(self, page: Page, selector: str, fixed: float = 0) -> ElementHandle:
+        """Waits until the element is visible.
+
+        Parameters:
+            `page` (Page): The page to wait on.
+            `selector` (str): The selector of the element.
+            `fixed` (float): Seconds of the fixed sleep this wait replaces. Default is 0.
+
+        Returns:
+            `ElementHandle`: The element."""
+        start = perf_counter()
+        try:
+            element = page.wait_for_selector(selector, timeout=self.timeout, state="visible")
+            self._record(f"selector {selector}", start, fixed, True)
+            return element
+        except PlaywrightTimeoutError:
+            self._record(f"selector {selector}", start, fixed, False)
+            raise
+
+    def wait_for_table(self, page: Page, table_id: str, min_rows: int = 1, fixed: float = 0) -> ElementHandle:
+        """Waits until the table is present and has at least `min_rows` body rows.
+
+        Parameters:
+            `page` (Page): The page to wait on.
+            `table_id` (str): The selector of the table.
+            `min_rows` (int): The least amount of rows the table must have. Default is 1.
+            `fixed` (float): Seconds of the fixed sleep this wait replaces. Default is 0.
+
+        Returns:
+            `ElementHandle`: The table."""
+        start = perf_counter()
+        try:
+            page.wait_for_function(TABLE_READY, arg=[table_id, min_rows], timeout=self.timeout)
+            table = page.wait_for_selector(table_id, timeout=self.timeout, state="visible")
+            self._record(f"table {table_id}", start, fixed, True)
+            return table
+        except PlaywrightTimeoutError:
+            self._record(f"table {table_id}", start, fixed, False)
+            raise
+
+    def wait_for_sorted(self, page: Page, table_id: str, data_stat: str, descending: bool = True,
+                        fixed: float = 0) -> bool:
+        """Waits until the table rows are ordered by the data-stat column.
+
+        Parameters:
+            `page` (Page): The page to wait on.
+            `table_id` (str): The selector of the table.
+            `data_stat` (str): The data-stat attribute of the sorted column.
+            `descending` (bool): Whether the column should be descending. Default is True.
+            `fixed` (float): Seconds of the fixed sleep this wait replaces. Default is 0.
+
+        Returns:
+            `True` if the table was sorted in time, `False` if not."""
+        start = perf_counter()
+        try:
+            page.wait_for_function(TABLE_SORTED, arg=[table_id, data_stat, descending], timeout=self.timeout)
+            self._record(f"sort {table_id} by {data_stat}", start, fixed, True)
+            return True
+        except PlaywrightTimeoutError:
+            self._record(f"sort {table_id} by {data_stat}", start, fixed, False)
+            return False
+
+    def wait_for_network_idle(self, page: Page, fixed: float = 0) -> bool:
+        """Waits until the page has had no network activity for 500 ms.
+
+        Parameters:
+            `page` (Page): The page to wait on.
+            `fixed` (float): Seconds of the fixed sleep this wait replaces. Default is 0.
+
+        Returns:
+            `True` if the network went quiet in time, `False` if not."""
+        start = perf_counter()
+        try:
+            page.wait_for_load_state("networkidle", timeout=self.idle_timeout)
+            self._record("network idle", start, fixed, True)
+            return True
+        except PlaywrightTimeoutError:
+            self._record("network idle", start, fixed, False)
+            return False
+
+    def summary(self) -> str:
+        """Returns a summary of the time spent waiting compared to the fixed sleeps."""
+        waited = sum(timing[1] for timing in self.timings)
+        fixed = sum(timing[2] for timing in self.timings)
+        timed_out = sum(1 for timing in self.timings if not timing[3])
+        return (f"{len(self.timings)} waits took {waited:.1f}s, "
+                f"fixed sleeps would have taken {fixed:.1f}s ({timed_out} timed out)")
+
+    def _record(self, name: str, start: float, fixed: float, is_ready: bool) -> None:
+        """Records how long a wait took.
+
+        Parameters:
+            `name` (str): The name of the wait.
+            `start` (float): The perf_counter value when the wait started.
+            `fixed` (float): Seconds of the fixed sleep the wait replaces.
+            `is_ready` (bool): Whether the condition was met before the timeout."""
+        seconds = perf_counter() - start
+        self.timings.append((name, seconds, fixed, is_ready))
+        instrumentation.record(f"wait {name.split()[0]}", "network", seconds)
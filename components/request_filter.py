@@ -0,0 +1,119 @@
+import re
+from typing import List
+from urllib.parse import urlparse
+from playwright.sync_api import Request, Route, Response
+
+BLOCKED_TYPES = ["image", "media", "font"]
+BLOCKED_DOMAINS = [
+    "doubleclick.net", "googlesyndication.com", "googletagservices.com", "googletagmanager.com",
+    "google-analytics.com", "amazon-adsystem.com", "adnxs.com", "adsrvr.org", "criteo.com",
+    "rubiconproject.com", "pubmatic.com", "openx.net", "casalemedia.com", "moatads.com",
+    "scorecardresearch.com", "quantserve.com", "taboola.com", "outbrain.com", "facebook.net",
+    "hotjar.com", "chartbeat.com", "branch.io",
+]
+# File extensions of the blocked resource types, for blocking by url where requests are not routed
+TYPE_EXTENSIONS = {
+    "image": ["png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico"],
+    "media": ["mp4", "webm", "m3u8", "ts", "mp3"],
+    "font": ["woff", "woff2", "ttf", "otf", "eot"],
+}
+
+
+class RequestFilter:
+    """Intercepts the requests of a browser context and aborts the ones the scrapers do not need:
+    resource types, ad/analytics domains, and scripts on pages whose url matches a pattern.
+    Counts the blocked and allowed requests and the bytes of the allowed responses.
+    Routing turns off the browser's HTTP cache, so a browser that keeps its cache blocks by
+    `url_patterns` instead, which cannot tell scripts of no script pages apart."""
+    blocked_types: List[str]
+    blocked_domains: List[str]
+    no_script_pages: List[str]
+    blocked: int
+    allowed: int
+    bytes_received: int
+
+    def __init__(self, blocked_types: List[str] = BLOCKED_TYPES, blocked_domains: List[str] = BLOCKED_DOMAINS,
+                 no_script_pages: List[str] = None):
+        """Parameters:
+            `blocked_types` (List[str]): Playwright resource types to block. Default is images, media and fonts.
+            `blocked_domains` (List[str]): Domains to block, subdomains included. Default is ads and analytics.
+            `no_script_pages` (List[str]): Url patterns of pages that run without scripts. Default is none.
+            Only for pages that are scraped without clicking, the table sorting needs the page scripts."""
+        self.blocked_types = blocked_types
+        self.blocked_domains = blocked_domains
+        self.no_script_pages = no_script_pages or []
+        self.blocked = 0
+        self.allowed = 0
+        self.bytes_received = 0
+
+    def handle(self, route: Route) -> None:
+        """Route handler for the sync api, aborts or continues the request."""
+        if self._is_blocked(route):
+            route.abort()
+        else:
+            route.continue_()
+
+    async def handle_async(self, route: Route) -> None:
+        """Route handler for the async api, aborts or continues the request."""
+        if self._is_blocked(route):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def count_response(self, response: Response) -> None:
+        """Response listener, adds the Content-Length of the response to the bytes received."""
+        length = response.headers.get("content-length")
+        if length is not None and length.isdigit():
+            self.bytes_received += int(length)
+
+    def count_finished(self, request: Request) -> None:
+        """Request listener for a browser that blocks by url, counts an allowed request."""
+        self.allowed += 1
+
+    def count_failed(self, request: Request) -> None:
+        """Request listener for a browser that blocks by url, counts a request the browser blocked."""
+        if "ERR_BLOCKED_BY_CLIENT" in (request.failure or ""):
+            self.blocked += 1
+
+    def url_patterns(self) -> List[str]:
+        """Returns the url patterns of the blocked domains and the file extensions of the blocked
+        types, for the browser to block the requests itself."""
+        patterns: List[str] = []
+        for domain in self.blocked_domains:
+            patterns += [f"*://{domain}/*", f"*://*.{domain}/*"]
+        for resource_type in self.blocked_types:
+            for extension in TYPE_EXTENSIONS.get(resource_type, []):
+                patterns += [f"*.{extension}", f"*.{extension}?*"]
+        return patterns
+
+    def summary(self) -> str:
+        """Returns a summary of the blocked and allowed requests."""
+        return (f"{self.blocked} requests blocked, {self.allowed} allowed, "
+                f"{self.bytes_received / 1024 / 1024:.1f} MB received")
+
+    def _is_blocked(self, route: Route) -> bool:
+        """Returns True if the request should be aborted, and counts it."""
+        request = route.request
+        is_blocked = (request.resource_type in self.blocked_types
+                      or self._is_blocked_domain(request.url)
+                      or (request.resource_type == "script" and self._is_no_script_page(request)))
+        if is_blocked:
+            self.blocked += 1
+        else:
+            self.allowed += 1
+        return is_blocked
+
+    def _is_blocked_domain(self, url: str) -> bool:
+        """Returns True if the url is on a blocked domain or one of its subdomains."""
+        host = urlparse(url).hostname or ""
+        return any(host == domain or host.endswith("." + domain) for domain in self.blocked_domains)
+
+    def _is_no_script_page(self, request: Request) -> bool:
+        """Returns True if the request was made by a page that runs without scripts."""
+        if not self.no_script_pages:
+            return False
+        try:
+            page_url = request.frame.url
+        except Exception:
+            return False
+        return any(re.search(pattern, page_url) for pattern in self.no_script_pages)
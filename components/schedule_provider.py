@@ -0,0 +1,130 @@
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from components.fetcher import Fetcher
+from components.scheduled_game import ScheduledGame, SCHEDULED, LIVE, FINAL, POSTPONED
+from components.team_directory import TeamDirectory
+
+STATS_API_URL = "https://statsapi.mlb.com/api/v1/schedule?sportId=1&date={day}&hydrate=team"
+CANCELLED_STATES = ["Postponed", "Suspended", "Cancelled"]
+
+
+def get_next_games(games: List[ScheduledGame]) -> Dict[str, datetime]:
+    """Returns the start of the next game of every team that has not started today, keyed by
+    team code. A team's gamelog does not change before then.
+
+    Parameters:
+        `games` (List[ScheduledGame]): Today's games."""
+    directory = TeamDirectory.load()
+    next_games: Dict[str, datetime] = {}
+    for game in games:
+        if game.get_status() != SCHEDULED or game.get_start() is None:
+            continue
+        for team in game.get_teams():
+            team_code = directory.get_code(team) or team
+            next_games[team_code] = min(next_games.get(team_code, game.get_start()), game.get_start())
+    return next_games
+
+
+def get_last_games(games: List[ScheduledGame], day: datetime = None) -> Dict[str, str]:
+    """Returns the newest date every team playing today can have a game on, keyed by team code.
+    That is today for a team whose games today are all final, yesterday for the others. A
+    batter whose stored games reach it has nothing new to scrape.
+
+    Parameters:
+        `games` (List[ScheduledGame]): Today's games.
+        `day` (datetime): Today. Default is today."""
+    day = day or datetime.today()
+    directory = TeamDirectory.load()
+    teams = {directory.get_code(team) or team for game in games for team in game.get_teams()}
+    last_games: Dict[str, str] = {}
+    for team_code in teams:
+        team_games = [game for game in games if team_code in
+                      [directory.get_code(team) or team for team in game.get_teams()]]
+        is_final = all(game.get_status() == FINAL for game in team_games)
+        last_day = day if is_final else day - timedelta(days=1)
+        last_games[team_code] = last_day.strftime("%Y-%m-%d")
+    return last_games
+
+
+class ScheduleProvider(ABC):
+    """Source of today's games. The teams of the games are team codes of the teams directory."""
+
+    @abstractmethod
+    def get_schedule(self) -> List[ScheduledGame]:
+        """Returns today's games with their start times and statuses, empty if there are none."""
+
+    def get_games(self) -> Tuple[bool, List[str]]:
+        """Returns whether there are games today and the teams that play them, sorted."""
+        teams = sorted({team for game in self.get_schedule() for team in game.get_teams()})
+        if not teams:
+            print("No games today")
+        return (len(teams) > 0, teams)
+
+
+class StatsApiScheduleProvider(ScheduleProvider):
+    """Reads the schedule from the public MLB stats api, one small json request that returns
+    the team codes, start times and statuses without rendering a page."""
+    _fetcher: Fetcher
+    _day: datetime
+
+    def __init__(self, fetcher: Fetcher, day: datetime = None):
+        """Parameters:
+            `fetcher` (Fetcher): The fetcher the schedule is requested with. It should have no page
+            cache, the statuses change during the day.
+            `day` (datetime): The day to get the games of. Default is today."""
+        self._fetcher = fetcher
+        self._day = day or datetime.today()
+
+    def get_schedule(self) -> List[ScheduledGame]:
+        """Returns today's games with the team codes of the teams directory."""
+        url = STATS_API_URL.format(day=self._day.strftime("%Y-%m-%d"))
+        schedule = json.loads(self._fetcher.get_html(url))
+        games: List[ScheduledGame] = []
+        for date in schedule.get("dates", []):
+            for game in date["games"]:
+                away = self._get_team_code(game["teams"]["away"]["team"])
+                home = self._get_team_code(game["teams"]["home"]["team"])
+                games.append(ScheduledGame(away, home, self._get_start(game), self._get_status(game)))
+        return games
+
+    def _get_team_code(self, team: dict) -> str:
+        """Returns the teams directory code of a team of the api."""
+        directory = TeamDirectory.load()
+        return directory.get_code(team["abbreviation"]) or directory.get_code(team["name"]) or team["abbreviation"]
+
+    def _get_start(self, game: dict) -> datetime:
+        """Returns the first pitch of the game in local time."""
+        start = datetime.fromisoformat(game["gameDate"].replace("Z", "+00:00"))
+        return start.astimezone().replace(tzinfo=None)
+
+    def _get_status(self, game: dict) -> str:
+        """Returns the status of the game."""
+        status = game["status"]
+        if status.get("detailedState") in CANCELLED_STATES:
+            return POSTPONED
+        if status.get("abstractGameState") == "Final":
+            return FINAL
+        if status.get("abstractGameState") == "Live":
+            return LIVE
+        return SCHEDULED
+
+
+class FallbackScheduleProvider(ScheduleProvider):
+    """Asks the providers in order and returns the schedule of the first one that does not raise."""
+    _providers: List[ScheduleProvider]
+
+    def __init__(self, providers: List[ScheduleProvider]):
+        """Parameters:
+            `providers` (List[ScheduleProvider]): The providers, the preferred one first."""
+        self._providers = providers
+
+    def get_schedule(self) -> List[ScheduledGame]:
+        """Returns the schedule of the first provider that answers."""
+        for provider in self._providers[:-1]:
+            try:
+                return provider.get_schedule()
+            except Exception as exception:
+                print(f"{type(provider).__name__} failed ({type(exception).__name__}), falling back")
+        return self._providers[-1].get_schedule()
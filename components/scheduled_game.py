@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import List
+
+SCHEDULED = "scheduled"
+LIVE = "live"
+FINAL = "final"
+POSTPONED = "postponed"
+
+
+class ScheduledGame:
+    __slots__ = ("away", "home", "start", "status")
+    away: str
+    home: str
+    start: datetime
+    status: str
+
+    def __init__(self, away: str, home: str, start: datetime = None, status: str = SCHEDULED):
+        self.away = away
+        self.home = home
+        self.start = start
+        self.status = status
+
+    def get_teams(self) -> List[str]:
+        return [self.away, self.home]
+
+    def get_start(self) -> datetime:
+        """Returns the first pitch in local time, None if the schedule does not show it."""
+        return self.start
+
+    def get_status(self) -> str:
+        """Returns "scheduled", "live", "final" or "postponed"."""
+        return self.status
+
+    def is_over(self) -> bool:
+        """Returns True if the game is final or will not be played today."""
+        return self.status in (FINAL, POSTPONED)
@@ -0,0 +1,82 @@
+import json
+from os import path, makedirs, replace
+from typing import List
+from zlib import crc32
+from components.batter import Batter
+from components.batters_game import BattersGame
+from components.team_directory import TeamDirectory
+
+SHARDS_DIR = "data/shards"
+
+
+def shard_of(team: str, num_shards: int) -> int:
+    """Returns the shard of a team. The crc32 of its team code is stable between runs and
+    machines, unlike `hash`, so a team always lands on the same shard.
+
+    Parameters:
+        `team` (str): The team code, or the team as named on the schedule.
+        `num_shards` (int): The number of shards."""
+    team_code = TeamDirectory.load().get_code(team) or team
+    return crc32(team_code.encode("UTF-8")) % num_shards
+
+
+def shard_teams(teams: List[str], index: int, num_shards: int) -> List[str]:
+    """Returns the teams of a shard.
+
+    Parameters:
+        `teams` (List[str]): The teams playing.
+        `index` (int): The shard, from 0 to `num_shards` - 1.
+        `num_shards` (int): The number of shards."""
+    return [team for team in teams if shard_of(team, num_shards) == index]
+
+
+def shard_path(index: int, directory: str = SHARDS_DIR) -> str:
+    """Returns the file the batters of a shard are written to."""
+    return path.join(directory, f"shard_{index}.json")
+
+
+def write_shard(batters: List[Batter], index: int, directory: str = SHARDS_DIR) -> None:
+    """Writes the batters of a shard with every game in their game logs. The file is written
+    next to its final path and moved over it, a merge never reads half a shard.
+
+    Parameters:
+        `batters` (List[Batter]): The scraped batters of the shard.
+        `index` (int): The shard.
+        `directory` (str): The folder of the shard files. Default is "data/shards"."""
+    if not path.exists(directory):
+        makedirs(directory)
+    shard = [{
+        "id": batter.get_id(),
+        "name": batter.get_name(),
+        "team": {"team_code": batter.team_code, "team_name": batter.team_name,
+                 "primary_color": batter.primary_color, "secondary_color": batter.secondary_color},
+        "games": [dict(game.to_dict(), game_number=game.get_game_number()) for game in batter.get_all_games()],
+    } for batter in batters]
+    file_path = shard_path(index, directory)
+    with open(file_path + ".part", "w", encoding="UTF-8") as file:
+        json.dump(shard, file)
+    replace(file_path + ".part", file_path)
+
+
+def read_shards(num_shards: int, directory: str = SHARDS_DIR) -> List[Batter]:
+    """Reads the batters of every shard back, in the order of the teams directory so the
+    ranking breaks ties the same way as a run without shards.
+
+    Parameters:
+        `num_shards` (int): The number of shards.
+        `directory` (str): The folder of the shard files. Default is "data/shards".
+
+    Returns:
+        `List[Batter]`: The batters of every shard."""
+    batters: List[Batter] = []
+    for index in range(num_shards):
+        with open(shard_path(index, directory), "r", encoding="UTF-8") as file:
+            for entry in json.load(file):
+                batter = Batter(entry["id"], entry["name"], entry["team"])
+                batter.add_games([BattersGame(game["date"], game["team_played"], game["hits"],
+                                              game["at_bats"], game["game_number"]) for game in entry["games"]])
+                batters.append(batter)
+
+    order = {team["team_code"]: position for position, team in enumerate(TeamDirectory.load().teams)}
+    batters.sort(key=lambda batter: order.get(batter.get_team_code(), len(order)))
+    return batters
@@ -0,0 +1,36 @@
+from typing import List
+from playwright.sync_api import ElementHandle
+from components.instrumentation import instrumentation
+
+ROW_SELECTOR = "tbody tr:not(.thead):not(.spacer)"
+EXTRACT_ROWS = """(rows, [stats, limit]) => rows.slice(0, limit === null ? rows.length : limit).map(row => {
+    const cells = {};
+    for (const stat of stats) {
+        const cell = row.querySelector(`[data-stat='${stat}']`);
+        if (cell === null) continue;
+        const entry = {};
+        for (const attribute of cell.attributes) entry[attribute.name] = attribute.value;
+        const link = cell.querySelector("a");
+        entry.text = cell.innerText.trim();
+        entry.link = link === null ? "" : link.innerText.trim();
+        cells[stat] = entry;
+    }
+    return cells;
+})"""
+
+
+@instrumentation.timed("extract_rows")
+def extract_rows(table: ElementHandle, data_stats: List[str], limit: int = None) -> List[dict]:
+    """Extracts the body rows of a table in a single call to the browser.
+    The rows have the same shape as the ones returned by `parse_table`: a dict keyed by
+    data-stat, every cell is a dict with its `text`, the `link` text of its anchor and its attributes.
+
+    Parameters:
+        `table` (ElementHandle): The table to extract the rows from.
+        `data_stats` (List[str]): The data-stat cells to extract from each row.
+        `limit` (int): The amount of rows to extract. Default is all of them.
+
+    Returns:
+        `List[dict]`: The rows of the table."""
+    return table.eval_on_selector_all(
+        ROW_SELECTOR, EXTRACT_ROWS, [data_stats, limit])
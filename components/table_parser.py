@@ -0,0 +1,102 @@
+import re
+from html.parser import HTMLParser
+from typing import List, Tuple
+from components.instrumentation import instrumentation
+
+
+class TableParser(HTMLParser):
+    """Parses the body rows of a baseball-reference table out of raw html.
+    Each row is a dict keyed by the data-stat of its cells, every cell is a dict with
+    its `text`, the `link` text of its anchor and its attributes."""
+    rows: List[dict]
+    _element_id: str
+    _in_container: bool
+    _in_table: bool
+    _in_body: bool
+    _is_done: bool
+    _row: dict
+    _cell: dict
+    _in_link: bool
+
+    def __init__(self, element_id: str):
+        """Parameters:
+            `element_id` (str): The id of the table, or of the element wrapping the table."""
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self._element_id = element_id.lstrip("#")
+        self._in_container = False
+        self._in_table = False
+        self._in_body = False
+        self._is_done = False
+        self._row = None
+        self._cell = None
+        self._in_link = False
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, str]]) -> None:
+        if self._is_done:
+            return
+        attributes = dict(attrs)
+        if not self._in_container:
+            self._in_container = attributes.get("id") == self._element_id
+            if not self._in_container:
+                return
+        if tag == "table":
+            self._in_table = True
+        elif self._in_table and tag == "tbody":
+            self._in_body = True
+        elif self._in_body and tag == "tr":
+            classes = (attributes.get("class") or "").split()
+            is_header = "thead" in classes or "spacer" in classes
+            self._row = None if is_header else {}
+        elif self._row is not None and tag in ("th", "td") and "data-stat" in attributes:
+            self._cell = {key: value or "" for key, value in attributes.items()}
+            self._cell["text"] = ""
+            self._cell["link"] = ""
+        elif self._cell is not None and tag == "a":
+            self._in_link = True
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._is_done or not self._in_table:
+            return
+        if tag == "a":
+            self._in_link = False
+        elif tag in ("th", "td") and self._cell is not None:
+            self._cell["text"] = self._cell["text"].strip()
+            self._cell["link"] = self._cell["link"].strip()
+            self._row[self._cell["data-stat"]] = self._cell
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            if self._row:
+                self.rows.append(self._row)
+            self._row = None
+        elif tag == "tbody":
+            self._in_body = False
+        elif tag == "table":
+            self._is_done = True
+
+    def handle_data(self, data: str) -> None:
+        if self._cell is None:
+            return
+        self._cell["text"] += data
+        if self._in_link:
+            self._cell["link"] += data
+
+
+@instrumentation.timed("parse_table")
+def parse_table(html: str, element_id: str) -> List[dict]:
+    """Parses the body rows of a table. Tables that baseball-reference ships inside html
+    comments are uncommented first.
+
+    Parameters:
+        `html` (str): The html of the page.
+        `element_id` (str): The id of the table, or of the element wrapping the table.
+
+    Returns:
+        `List[dict]`: The rows of the table."""
+    html = re.sub(r"<!--(.*?)-->",
+                  lambda comment: comment.group(1) if "<table" in comment.group(1) else "",
+                  html, flags=re.S)
+    parser = TableParser(element_id)
+    parser.feed(html)
+    parser.close()
+    return parser.rows
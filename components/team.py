@@ -2,17 +2,19 @@ from typing import List, Tuple
 from components.batter import Batter
 
 class Team:
+    __slots__ = ("team_code", "name", "primary_color", "secondary_color", "batters")
     team_code: str
     name: str
     primary_color: str
     secondary_color: str
-    batters: List[Batter] = []
+    batters: List[Batter]
 
     def __init__(self, team_code: str, name: str, primary_color: str, secondary_color: str) -> None:
         self.team_code = team_code
         self.name = name
         self.primary_color = primary_color
         self.secondary_color = secondary_color
+        self.batters = []
 
     def get_team_code(self) -> str:
         return self.team_code
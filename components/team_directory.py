@@ -0,0 +1,91 @@
+import json
+from threading import Lock
+from typing import Dict, Iterable, List
+
+# Names and abbreviations used by MLB.com and the stats api that the directory does not contain
+ALIASES: Dict[str, str] = {
+    "D-backs": "ARI", "Dbacks": "ARI", "AZ": "ARI", "ATH": "OAK", "A's": "OAK", "CWS": "CHW", "KC": "KCR",
+    "SD": "SDN", "SDP": "SDN", "SF": "SFG", "TB": "TBA", "TBR": "TBA", "WSH": "WSN",
+}
+# Nicknames of two words, every other nickname is the last word of the team name
+LONG_NICKNAMES = ["Red Sox", "White Sox", "Blue Jays"]
+
+
+class TeamDirectory:
+    """The teams directory with indexes by team code, full name, nickname and alias. Lookups are
+    exact and case insensitive, "Sox" matches neither Sox team. Use `load` to share one
+    directory per file for the whole process."""
+    teams: List[dict]
+    _index: Dict[str, dict]
+    _loaded: Dict[str, "TeamDirectory"] = {}
+    _lock: Lock = Lock()
+
+    def __init__(self, teams: List[dict]):
+        """Parameters:
+            `teams` (List[dict]): The teams directory entries."""
+        self.teams = teams
+        self._index = {}
+        for team in teams:
+            self._add(team["team_code"], team)
+            self._add(team["team_name"], team)
+            self._add(self._nickname(team["team_name"]), team)
+        for alias, team_code in ALIASES.items():
+            if self.get(team_code) is not None:
+                self._add(alias, self.get(team_code))
+
+    @classmethod
+    def load(cls, file_path: str = "data/teams_directory.json") -> "TeamDirectory":
+        """Returns the directory of the file, read on the first call only.
+
+        Parameters:
+            `file_path` (str): The teams directory file. Default is "data/teams_directory.json"."""
+        with cls._lock:
+            if file_path not in cls._loaded:
+                with open(file_path, "r", encoding="UTF-8") as file:
+                    cls._loaded[file_path] = cls(json.load(file))
+            return cls._loaded[file_path]
+
+    def get(self, name: str) -> dict:
+        """Returns the directory entry of a team code, name, nickname or alias, None if there is none.
+
+        Parameters:
+            `name` (str): The team code, name, nickname or alias."""
+        return self._index.get(self._key(name))
+
+    def get_code(self, name: str) -> str:
+        """Returns the team code of a team code, name, nickname or alias, None if there is none.
+
+        Parameters:
+            `name` (str): The team code, name, nickname or alias."""
+        team = self.get(name)
+        return team["team_code"] if team is not None else None
+
+    def select(self, names: Iterable[str]) -> List[dict]:
+        """Returns the entries of the teams, in the order of the directory. Names that match no
+        team are printed and left out.
+
+        Parameters:
+            `names` (Iterable[str]): The team codes, names, nicknames or aliases."""
+        codes = set()
+        for name in names:
+            team_code = self.get_code(name)
+            if team_code is None:
+                print(f"Unknown team {name}")
+            else:
+                codes.add(team_code)
+        return [dict(team) for team in self.teams if team["team_code"] in codes]
+
+    def _add(self, name: str, team: dict) -> None:
+        """Indexes the team under the name, the first team indexed under a name keeps it."""
+        self._index.setdefault(self._key(name), team)
+
+    def _key(self, name: str) -> str:
+        """Returns the index key of a name."""
+        return " ".join(name.split()).lower()
+
+    def _nickname(self, team_name: str) -> str:
+        """Returns the nickname of the team. Ex: "Boston Red Sox" -> "Red Sox"."""
+        for nickname in LONG_NICKNAMES:
+            if team_name.endswith(" " + nickname):
+                return nickname
+        return team_name.split()[-1]
@@ -1,31 +1,342 @@
+from argparse import ArgumentParser, Namespace
+from asyncio import Semaphore, gather, run
+from multiprocessing import get_context
+from typing import List, Tuple
 from components.browser import Browser
+from components.async_browser import AsyncBrowser
 from scrapers.teams_scraper import TeamsScraper
 from scrapers.stats_scraper import StatsScraper
 from scrapers.games_today_scraper import GamesTodayScraper
+from scrapers.async_teams_scraper import AsyncTeamsScraper
+from scrapers.async_stats_scraper import AsyncStatsScraper
+from scrapers.async_games_today_scraper import AsyncGamesTodayScraper
+from scrapers.league_scraper import LeagueScraper
+from components.batter import Batter
 from components.cms import CMS
+from components.fetcher import Fetcher
+from components.page_cache import PageCache
+from components.gamelog_store import GamelogStore
+from components.checkpoint import Checkpoint
+from components.rate_limiter import AdaptiveRateLimiter
+from components.database import Database
 from components.logger import Logger
+from components.schedule_provider import ScheduleProvider, StatsApiScheduleProvider, FallbackScheduleProvider
+from components.schedule_provider import get_next_games, get_last_games
+from components.scheduled_game import ScheduledGame
+from scheduler import GameScheduler
+from components.instrumentation import instrumentation
+from components.sharding import SHARDS_DIR, shard_teams, write_shard, read_shards
 
+NUM_BATTERS = 3
+NUM_PAGES = 3
+USE_BROWSER_TABLES = True
+INCREMENTAL = True
+USE_ASYNC = False
+LEAN_BROWSER = True
+USE_DATABASE = True
+EXPORT_MODE = "pretty"
+TEAM_PAGES = 4
+SECONDS_BETWEEN_REQUESTS = 1
+MAX_REQUESTS_PER_SECOND = 2
+# baseball-reference allows about 20 requests a minute and bans for a while on a 429
+HOST_INTERVALS = {"www.baseball-reference.com": 3}
+HOST_MAX_REQUESTS_PER_SECOND = {"www.baseball-reference.com": 1 / 3}
+USE_STATS_API = True
+LEAGUE_BATTERS = 50
+BROWSER_PROFILE = "data/browser_profile"
+BROWSER_CDP_URL = None
+BROWSER_MEMORY_LIMIT_MB = 1024
+LEAGUE_WORKERS = 4
 
-def main() -> None:
-    NUM_BATTERS = 3
+
+def parse_args() -> Namespace:
+    """Parses the command line arguments."""
+    parser = ArgumentParser(description="Scrapes the hottest MLB batters and updates the CMS.")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip the teams and batters finished by the last run and retry the failed ones")
+    parser.add_argument("--schedule", action="store_true",
+                        help="keep running and scrape each team as soon as its games today are over")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--league", action="store_true",
+                      help="rank every batter of the teams playing from the box scores instead of the top hitters "
+                           "of each team")
+    mode.add_argument("--shards", type=int, default=1,
+                      help="split the teams playing into this many shards, each scraped by its own worker process")
+    parser.add_argument("--shard", type=int,
+                        help="only scrape this shard of --shards and write it to data/shards, without updating the CMS")
+    parser.add_argument("--export-json", action="store_true",
+                        help="write the latest ranking in the database to data/batters.json and exit")
+    args = parser.parse_args()
+    if USE_ASYNC and (args.schedule or args.league or args.shards > 1):
+        parser.error("--schedule, --league and --shards need the sync pipeline, set USE_ASYNC = False")
+    return args
+
+
+def get_store(database: Database) -> GamelogStore:
+    """Returns the game history for incremental runs, the database when there is one."""
+    if not INCREMENTAL:
+        return None
+    return database if database is not None else GamelogStore()
+
+
+def export_json() -> None:
+    """Writes the latest ranking in the database to data/batters.json."""
+    database = Database()
+    try:
+        database.export_json(mode=EXPORT_MODE)
+    finally:
+        database.close()
+
+
+def make_rate_limiter(num_shards: int = 1) -> AdaptiveRateLimiter:
+    """Builds the rate limiter of a process. The shards of a run each get their part of the
+    starting and highest rate of every host, together they stay within one run's."""
+    return AdaptiveRateLimiter(SECONDS_BETWEEN_REQUESTS * num_shards,
+                               {host: seconds * num_shards for host, seconds in HOST_INTERVALS.items()},
+                               max_rate=MAX_REQUESTS_PER_SECOND / num_shards,
+                               max_rates={host: rate / num_shards
+                                          for host, rate in HOST_MAX_REQUESTS_PER_SECOND.items()})
+
+
+def make_fetcher(rate_limiter: AdaptiveRateLimiter, shard: int = None) -> Fetcher:
+    """Builds the fetcher of the scrapers, None when they use the browser tables. A shard keeps
+    its own page cache, it always gets the same teams so a later run finds its own pages."""
+    if USE_BROWSER_TABLES:
+        return None
+    cache_directory = "cache" if shard is None else f"cache/shard_{shard}"
+    return Fetcher(pool_size=NUM_PAGES, cache=PageCache(cache_directory), rate_limiter=rate_limiter)
+
+
+def make_scrapers(browser: Browser, database: Database = None, fetcher: Fetcher = None, resume: bool = False,
+                  shard: int = None, games: List[ScheduledGame] = None) -> Tuple[TeamsScraper, StatsScraper]:
+    """Builds the teams and stats scrapers on the fetcher, or on the browser when there is
+    none. A shard keeps its own checkpoint. Today's games tell the stats scraper how long
+    gamelogs stay cached and which batters have no new games. The caller owns the database
+    and the fetcher and closes them."""
+    store = get_store(database)
+    if shard is None:
+        checkpoint = Checkpoint(resume=resume)
+    else:
+        checkpoint = Checkpoint(f"{SHARDS_DIR}/shard_{shard}_checkpoint.jsonl", resume)
+    if fetcher is None:
+        teams_scraper = TeamsScraper(browser, checkpoint=checkpoint, database=database,
+                                     export_mode=EXPORT_MODE, num_pages=TEAM_PAGES)
+        stats_scraper = StatsScraper(browser, NUM_PAGES, store=store, checkpoint=checkpoint,
+                                     database=database, export_mode=EXPORT_MODE)
+    else:
+        teams_scraper = TeamsScraper(fetcher=fetcher, checkpoint=checkpoint, database=database,
+                                     export_mode=EXPORT_MODE, num_pages=TEAM_PAGES)
+        stats_scraper = StatsScraper(num_pages=NUM_PAGES, fetcher=fetcher, store=store,
+                                     checkpoint=checkpoint, database=database, export_mode=EXPORT_MODE)
+    if games is not None:
+        stats_scraper.set_schedule(get_next_games(games), get_last_games(games))
+    return teams_scraper, stats_scraper
+
+
+def get_teams_playing(games: List[ScheduledGame]) -> List[str]:
+    """Returns the teams of today's games, sorted."""
+    return sorted({team for game in games for team in game.get_teams()})
+
+
+def make_schedule_provider(browser: Browser) -> ScheduleProvider:
+    """Builds the schedule provider, the stats api with the schedule page as its fallback."""
+    if not USE_STATS_API:
+        return GamesTodayScraper(browser)
+    return FallbackScheduleProvider([StatsApiScheduleProvider(Fetcher(pool_size=1)), GamesTodayScraper(browser)])
+
+
+def get_league_batters(teams_scraper: TeamsScraper, teams_playing: List[str],
+                       rate_limiter: AdaptiveRateLimiter) -> List[Batter]:
+    """Picks the `LEAGUE_BATTERS` best batters in recent form of the teams playing, see `LeagueScraper`."""
+    fetcher = Fetcher(pool_size=LEAGUE_WORKERS, cache=PageCache(), rate_limiter=rate_limiter)
+    league_scraper = LeagueScraper(fetcher, LEAGUE_WORKERS)
+    try:
+        return league_scraper.get_batters(teams_scraper.get_teams(teams_playing), LEAGUE_BATTERS)
+    finally:
+        fetcher.close()
+
+
+def run_shard(index: int, num_shards: int, games: List[ScheduledGame], resume: bool, stages_path: str) -> None:
+    """Worker process of a sharded run. Scrapes the rosters and games of the teams of its shard
+    on its own browser and writes the batters to the shard file, the coordinator ranks them.
+
+    Parameters:
+        `index` (int): The shard.
+        `num_shards` (int): The number of shards.
+        `games` (List[ScheduledGame]): Today's games.
+        `resume` (bool): Whether to continue from the shard's checkpoint.
+        `stages_path` (str): The stages file of the run, the stages of the worker are appended to it."""
+    instrumentation.start(stages_path)
+    rate_limiter = make_rate_limiter(num_shards)
+    database = Database() if USE_DATABASE else None
+    fetcher = make_fetcher(rate_limiter, index)
+    browser = Browser()
+    browser.start_browser(is_headless=True, is_lean=LEAN_BROWSER, user_data_dir=f"{BROWSER_PROFILE}_{index}",
+                          cdp_url=BROWSER_CDP_URL, memory_limit_mb=BROWSER_MEMORY_LIMIT_MB,
+                          rate_limiter=rate_limiter)
+    try:
+        teams = shard_teams(get_teams_playing(games), index, num_shards)
+        print(f"Shard {index}: {', '.join(teams) or 'no teams'}")
+        teams_scraper, stats_scraper = make_scrapers(browser, database, fetcher, resume, shard=index, games=games)
+        batters = teams_scraper.get_batters(NUM_BATTERS, teams) if teams else []
+        stats_scraper.scrape_batters(batters)
+        write_shard(batters, index)
+        print(f"Shard {index} rates:\n{rate_limiter.summary()}")
+    finally:
+        instrumentation.stop()
+        browser.close_browser()
+        if fetcher is not None:
+            fetcher.close()
+        if database is not None:
+            database.close()
+
+
+def run_shards(games: List[ScheduledGame], num_shards: int, resume: bool, stages_path: str) -> List[Batter]:
+    """Runs every shard in its own worker process, then merges the shard files and ranks the
+    batters once.
+
+    Parameters:
+        `games` (List[ScheduledGame]): Today's games.
+        `num_shards` (int): The number of shards.
+        `resume` (bool): Whether the workers continue from their checkpoints.
+        `stages_path` (str): The stages file of the run.
+
+    Returns:
+        `List[Batter]`: Every batter, ranked."""
+    context = get_context("spawn")
+    workers = [context.Process(target=run_shard, args=(index, num_shards, games, resume, stages_path),
+                               name=f"shard-{index}") for index in range(num_shards)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    failed = [str(index) for index, worker in enumerate(workers) if worker.exitcode != 0]
+    if failed:
+        raise RuntimeError(f"Shards {', '.join(failed)} failed, rerun with --resume to retry them")
+
+    database = Database() if USE_DATABASE else None
+    try:
+        stats_scraper = StatsScraper(store=get_store(database), database=database, export_mode=EXPORT_MODE)
+        return stats_scraper.finish(read_shards(num_shards))
+    finally:
+        if database is not None:
+            database.close()
+
+
+def main(resume: bool = False, scheduled: bool = False, league: bool = False, shards: int = 1) -> None:
+    """Scrapes every team playing today once. When scheduled it keeps running and scrapes
+    each team once its games are over, see `GameScheduler`. In league mode every batter of
+    the teams playing is ranked instead of the top hitters of each team. With several shards
+    the teams are split between worker processes, see `run_shards`."""
     logger = Logger()
+    instrumentation.start(logger.get_stages_path())
+    cms = CMS()
+    rate_limiter = make_rate_limiter()
+    database = Database() if USE_DATABASE else None
+    fetcher = make_fetcher(rate_limiter)
 
     browser = Browser()
-    browser.start_browser(is_headless=True)
+    browser.start_browser(is_headless=True, is_lean=LEAN_BROWSER, user_data_dir=BROWSER_PROFILE,
+                          cdp_url=BROWSER_CDP_URL, memory_limit_mb=BROWSER_MEMORY_LIMIT_MB,
+                          rate_limiter=rate_limiter)
     try:
         logger.report_start()
-        has_teams, teams_playing = GamesTodayScraper(browser).get_games()
-        if has_teams == True:
-            batters = TeamsScraper(browser).get_batters(NUM_BATTERS, teams_playing)
-            final_batters = StatsScraper(browser).get_stats(batters)
-            CMS().update_cms(final_batters)
+        if scheduled:
+            teams_scraper, stats_scraper = make_scrapers(browser, database, fetcher, resume)
+            GameScheduler(make_schedule_provider(browser), teams_scraper, stats_scraper, cms, NUM_BATTERS).run()
+        else:
+            games = make_schedule_provider(browser).get_schedule()
+            teams_playing = get_teams_playing(games)
+            if not teams_playing:
+                print("No games today")
+            else:
+                if shards > 1:
+                    final_batters = run_shards(games, shards, resume, logger.get_stages_path())
+                elif league:
+                    teams_scraper, stats_scraper = make_scrapers(browser, database, fetcher, resume, games=games)
+                    final_batters = stats_scraper.finish(
+                        get_league_batters(teams_scraper, teams_playing, rate_limiter))
+                else:
+                    teams_scraper, stats_scraper = make_scrapers(browser, database, fetcher, resume, games=games)
+                    batters = teams_scraper.get_batters(NUM_BATTERS, teams_playing)
+                    final_batters = stats_scraper.get_stats(batters)
+                cms.update_cms(final_batters)
     except Exception:
         logger.report_exception()
     finally:
+        logger.report_waits(browser.readiness.summary())
+        if browser.request_filter is not None:
+            logger.report_requests(browser.request_filter.summary())
+        cms.close()
+        logger.report_cms(cms.summary())
+        logger.report_rates(rate_limiter.summary())
+        logger.report_stages(instrumentation.summary())
+        instrumentation.stop()
         logger.report_end()
         logger.make_report()
         browser.close_browser()
+        if fetcher is not None:
+            fetcher.close()
+        if database is not None:
+            database.close()
+
+
+async def async_main(resume: bool = False) -> None:
+    """Runs the pipeline on the async browser. Each team's batters start scraping as soon as
+    its roster is in, with at most `NUM_PAGES` pages open at once."""
+    logger = Logger()
+    instrumentation.start(logger.get_stages_path())
+    cms = CMS()
+    rate_limiter = make_rate_limiter()
+    database = Database() if USE_DATABASE else None
+
+    browser = AsyncBrowser()
+    await browser.start_browser(is_headless=True, is_lean=LEAN_BROWSER, rate_limiter=rate_limiter)
+    try:
+        logger.report_start()
+        has_teams, teams_playing = await AsyncGamesTodayScraper(browser).get_games()
+        if has_teams == True:
+            semaphore = Semaphore(NUM_PAGES)
+            store = get_store(database)
+            checkpoint = Checkpoint(resume=resume)
+            teams_scraper = AsyncTeamsScraper(browser, semaphore, checkpoint, database, EXPORT_MODE)
+            stats_scraper = AsyncStatsScraper(browser, semaphore, store, checkpoint, database, EXPORT_MODE)
+
+            async def scrape_team(team: dict) -> List[Batter]:
+                batters = await teams_scraper.get_team_batters(team, NUM_BATTERS)
+                await stats_scraper.scrape_batters(batters)
+                return batters
+
+            rosters = await gather(*(scrape_team(team) for team in teams_scraper.get_teams(teams_playing)))
+            final_batters = stats_scraper.finish([batter for roster in rosters for batter in roster])
+            cms.update_cms(final_batters)
+    except Exception:
+        logger.report_exception()
+    finally:
+        logger.report_waits(browser.readiness.summary())
+        if browser.request_filter is not None:
+            logger.report_requests(browser.request_filter.summary())
+        cms.close()
+        logger.report_cms(cms.summary())
+        logger.report_rates(rate_limiter.summary())
+        logger.report_stages(instrumentation.summary())
+        instrumentation.stop()
+        logger.report_end()
+        logger.make_report()
+        await browser.close_browser()
+        if database is not None:
+            database.close()
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.export_json:
+        export_json()
+    elif args.shard is not None:
+        games = StatsApiScheduleProvider(Fetcher(pool_size=1)).get_schedule()
+        run_shard(args.shard, args.shards, games, args.resume, Logger().get_stages_path())
+    elif USE_ASYNC:
+        run(async_main(args.resume))
+    else:
+        main(args.resume, args.schedule, args.league, args.shards)
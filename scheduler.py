@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+from time import sleep
+from typing import Dict, List, Tuple
+from components.batter import Batter
+from components.cms import CMS
+from components.scheduled_game import ScheduledGame
+from components.schedule_provider import ScheduleProvider, get_next_games, get_last_games
+from scrapers.teams_scraper import TeamsScraper
+from scrapers.stats_scraper import StatsScraper
+
+POLL_SECONDS = 600
+GAME_LENGTH = timedelta(hours=2, minutes=45)
+BATCH_TEAMS = 4
+LAST_CHECK_HOUR = 3
+
+
+class GameScheduler:
+    """Long running mode that follows today's schedule. A team's batters are scraped once all of
+    its games today are final or postponed, a few teams at a time, and the CMS is updated after
+    every batch with every batter scraped so far. Teams whose games are still not over by
+    `LAST_CHECK_HOUR` the next morning are scraped anyway."""
+    _games_today: ScheduleProvider
+    _teams_scraper: TeamsScraper
+    _stats_scraper: StatsScraper
+    _cms: CMS
+    _num_batters: int
+    _batch_teams: int
+    _poll_seconds: int
+    _deadline: datetime
+    _starts: Dict[Tuple[str, str], datetime]
+    _batters: List[Batter]
+
+    def __init__(self, games_today: ScheduleProvider, teams_scraper: TeamsScraper, stats_scraper: StatsScraper,
+                 cms: CMS, num_batters: int, batch_teams: int = BATCH_TEAMS, poll_seconds: int = POLL_SECONDS):
+        """Parameters:
+            `games_today` (ScheduleProvider): Reads the schedule, called again to refresh the statuses.
+            `teams_scraper` (TeamsScraper): Scrapes the rosters of the teams in a batch.
+            `stats_scraper` (StatsScraper): Scrapes the games of the batters in a batch.
+            `cms` (CMS): Published to after every batch.
+            `num_batters` (int): The number of batters to get from each team.
+            `batch_teams` (int): The most teams scraped before publishing. Default is 4.
+            `poll_seconds` (int): Seconds between schedule refreshes while games are on. Default is 600."""
+        self._games_today = games_today
+        self._teams_scraper = teams_scraper
+        self._stats_scraper = stats_scraper
+        self._cms = cms
+        self._num_batters = num_batters
+        self._batch_teams = batch_teams
+        self._poll_seconds = poll_seconds
+        today = datetime.combine(datetime.today().date(), datetime.min.time())
+        self._deadline = today + timedelta(days=1, hours=LAST_CHECK_HOUR)
+        self._starts = {}
+        self._batters = []
+
+    def run(self) -> List[Batter]:
+        """Follows the schedule until every team playing today is scraped and published.
+
+        Returns:
+            `List[Batter]`: Every batter scraped, ranked."""
+        games = self._refresh_schedule()
+        if not games:
+            print("No games today")
+            return []
+
+        pending = sorted({team for game in games for team in game.get_teams()})
+        while pending:
+            ready = [team for team in pending if self._is_over(team, games)]
+            if not ready and datetime.now() >= self._deadline:
+                print(f"Still not over at {self._deadline:%H:%M}: {', '.join(pending)}")
+                ready = pending
+            if not ready:
+                seconds = self._seconds_until_next_check(games)
+                print(f"{len(pending)} teams left, checking the schedule again in {seconds / 60:.0f} minutes")
+                sleep(seconds)
+                games = self._refresh_schedule()
+                continue
+
+            batch = ready[:self._batch_teams]
+            self._stats_scraper.set_schedule(get_next_games(games), get_last_games(games))
+            self._scrape_batch(batch)
+            pending = [team for team in pending if team not in batch]
+
+        return self._batters
+
+    def _scrape_batch(self, teams: List[str]) -> None:
+        """Scrapes the rosters and games of the teams, then publishes every batter scraped so far.
+        The teams scraper keeps the rosters of every batch, the ones past the batters scraped so
+        far are the batch's.
+
+        Parameters:
+            `teams` (List[str]): The teams as the schedule provider returns them."""
+        print(f"Games over for {', '.join(teams)}")
+        rosters = self._teams_scraper.get_batters(self._num_batters, teams)
+        new_batters = rosters[len(self._batters):]
+        self._stats_scraper.scrape_batters(new_batters)
+        self._batters.extend(new_batters)
+        self._batters = self._stats_scraper.finish(list(self._batters))
+        self._cms.update_cms(self._batters)
+
+    def _refresh_schedule(self) -> List[ScheduledGame]:
+        """Reads the schedule. A game that has started no longer shows its start time, so the
+        start times seen before are filled back in."""
+        games = self._games_today.get_schedule()
+        for game in games:
+            key = (game.away, game.home)
+            if game.start is not None:
+                self._starts.setdefault(key, game.start)
+            else:
+                game.start = self._starts.get(key)
+        return games
+
+    def _is_over(self, team: str, games: List[ScheduledGame]) -> bool:
+        """Returns True if every game of the team today is final or postponed."""
+        return all(game.is_over() for game in games if team in game.get_teams())
+
+    def _seconds_until_next_check(self, games: List[ScheduledGame]) -> float:
+        """Returns the seconds to sleep before refreshing the schedule. Until the first game that
+        is not over could end the scheduler sleeps through, after that it polls."""
+        now = datetime.now()
+        ends = [game.start + GAME_LENGTH for game in games if not game.is_over() and game.start is not None]
+        first_end = min(ends, default=now)
+        wake_up = min(max(first_end, now + timedelta(seconds=self._poll_seconds)), self._deadline)
+        return max(0, (wake_up - now).total_seconds())
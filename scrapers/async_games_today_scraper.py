@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import List, Tuple
+from components.async_browser import AsyncBrowser
+from scrapers.games_today_scraper import GamesTodayScraper, SECTION_LABEL, SECTION_WRAPPER
+from scrapers.games_today_scraper import GAME_WRAPPER, AWAY_WRAPPER, HOME_WRAPPER, TEAM_WRAPPER
+
+
+class AsyncGamesTodayScraper(GamesTodayScraper):
+    """Asyncio version of `GamesTodayScraper`."""
+    _browser: AsyncBrowser
+
+    def __init__(self, browser: AsyncBrowser, day: datetime = None):
+        """Initialize the scraper.
+
+        Parameters:
+            `browser` (AsyncBrowser): The async browser instance.
+            `day` (datetime): The day to get the games of. Default is today."""
+        super().__init__(browser, day)
+
+    async def get_games(self) -> Tuple[bool, List[str]]:
+        """
+        Opens the MLB.com schedule page and returns a list of teams that have games today.
+
+        Returns:
+            Tuple[bool, List[str]]:
+        - True if there are games today and a list of the teams that have games today
+        - False if there are no games today and an empty list
+        """
+        page = self._browser.page
+        readiness = self._browser.readiness
+        today = self._day.strftime('%Y-%m-%d')
+        await self._browser.open_url(f"https://www.mlb.com/schedule/{today}")
+        await readiness.wait_for_selector(page, SECTION_LABEL, self._browser._fixed_seconds(8, 5))
+        await readiness.wait_for_network_idle(page)
+
+        day = (await page.locator(SECTION_LABEL).all_inner_texts())[0]
+        has_games = self._is_today(day)
+        if has_games:
+            schedule = await readiness.wait_for_selector(page, SECTION_WRAPPER)
+            matchups = await schedule.eval_on_selector_all(
+                GAME_WRAPPER,
+                """(games, [away, home, team]) => games.map(game => [
+                    game.querySelector(away).querySelector(team).innerText,
+                    game.querySelector(home).querySelector(team).innerText,
+                ])""",
+                [AWAY_WRAPPER, HOME_WRAPPER, TEAM_WRAPPER])
+            for away, home in matchups:
+                self._add_to_teams(self._clean_team_name(away))
+                self._add_to_teams(self._clean_team_name(home))
+
+            return (has_games, sorted(self._teams))
+
+        print("No games today")
+        return (has_games, [])
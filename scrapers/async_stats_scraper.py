@@ -0,0 +1,91 @@
+from asyncio import Semaphore, gather
+from typing import List
+from components.async_browser import AsyncBrowser
+from components.backoff import with_backoff_async
+from components.batter import Batter
+from components.gamelog_store import GamelogStore
+from components.checkpoint import Checkpoint
+from components.database import Database
+from components.table_extractor import ROW_SELECTOR, EXTRACT_ROWS
+from scrapers.stats_scraper import StatsScraper, GAME_STATS
+
+
+class AsyncStatsScraper(StatsScraper):
+    """Asyncio version of `StatsScraper`. Every batter is scraped on its own page, the
+    semaphore bounds how many pages are open at once."""
+    _browser: AsyncBrowser
+    _semaphore: Semaphore
+
+    def __init__(self, browser: AsyncBrowser, semaphore: Semaphore, store: GamelogStore = None,
+                 checkpoint: Checkpoint = None, database: Database = None, export_mode: str = "pretty"):
+        """Initialize the scraper.
+
+        Parameters:
+            `browser` (AsyncBrowser): The async browser instance.
+            `semaphore` (Semaphore): Bounds the pages open at once.
+            `store` (GamelogStore): The stored game history. Default is None.
+            `checkpoint` (Checkpoint): The journal finished batters are recorded in. Default is None.
+            `database` (Database): The database the batters and rankings are stored in. Default is None.
+            `export_mode` (str): The `JsonExporter` mode of the json file. Default is "pretty"."""
+        super().__init__(browser, store=store, checkpoint=checkpoint, database=database, export_mode=export_mode)
+        self._semaphore = semaphore
+
+    async def get_stats(self, batters: List[Batter]) -> List[Batter]:
+        """Adds the stats to the batters previously scraped.
+
+        Parameters:
+            `batters` (List[Batter]): The batters to add the stats to.
+
+        Returns:
+            `batters` (List[Batter]): The batters with the stats added."""
+        await self.scrape_batters(batters)
+        return self.finish(batters)
+
+    async def scrape_batters(self, batters: List[Batter]) -> None:
+        """Adds the games to the batters without sorting or exporting them. Used to start
+        on a team's batters as soon as its roster is scraped.
+
+        Parameters:
+            `batters` (List[Batter]): The batters to add the games to."""
+        self._start_progress()
+        batters_to_scrape = self._restore_checkpointed(self._load_stored_games(batters))
+        await gather(*(self._scrape_batter(batter) for batter in batters_to_scrape))
+
+    async def _scrape_batter(self, batter: Batter) -> None:
+        """Scrapes the last 10 games of the batter on its own page. The page is retried with a
+        backoff, a batter that still fails is recorded in the checkpoint.
+
+        Parameters:
+            `batter` (Batter): The batter to scrape."""
+        try:
+            rows = await with_backoff_async(lambda: self._get_rows_from_page(batter))
+        except Exception:
+            self._record_failed([batter])
+            raise
+        self._complete(batter, self._build_games(rows))
+
+    async def _get_rows_from_page(self, batter: Batter) -> List[dict]:
+        """Opens the gamelog page of the batter, sorts it by date and gets the rows of the last 10 games.
+
+        Parameters:
+            `batter` (Batter): The batter to scrape.
+
+        Returns:
+            `List[dict]`: The game rows, newest first."""
+        id, name, team_name = batter.get_url_info()
+        readiness = self._browser.readiness
+        async with self._semaphore:
+            page = await self._browser.new_page()
+            try:
+                await self._browser.open_url(self._batters_url(id), page)
+                print(f"Scraping {name} from {team_name}")
+                table = await readiness.wait_for_table(
+                    page, "#div_batting_gamelogs", fixed=self._browser._fixed_seconds(6, 3))
+                date_column = await table.query_selector("[data-stat='date_game']")
+                for _ in range(2):
+                    await date_column.click()
+                await readiness.wait_for_sorted(
+                    page, "#div_batting_gamelogs", "date_game", fixed=self._browser._fixed_seconds(2, 1))
+                return await table.eval_on_selector_all(ROW_SELECTOR, EXTRACT_ROWS, [GAME_STATS, 10])
+            finally:
+                await page.close()
@@ -0,0 +1,97 @@
+from asyncio import Semaphore, gather
+from typing import List
+from components.async_browser import AsyncBrowser
+from components.backoff import with_backoff_async
+from components.batter import Batter
+from components.checkpoint import Checkpoint
+from components.database import Database
+from components.table_extractor import ROW_SELECTOR, EXTRACT_ROWS
+from scrapers.teams_scraper import TeamsScraper
+
+
+class AsyncTeamsScraper(TeamsScraper):
+    """Asyncio version of `TeamsScraper`. Every team is scraped on its own page, the
+    semaphore bounds how many pages are open at once."""
+    _browser: AsyncBrowser
+    _semaphore: Semaphore
+
+    def __init__(self, browser: AsyncBrowser, semaphore: Semaphore, checkpoint: Checkpoint = None,
+                 database: Database = None, export_mode: str = "pretty") -> None:
+        """Initialize the scraper.
+
+        Parameters:
+            `browser` (AsyncBrowser): The async browser instance.
+            `semaphore` (Semaphore): Bounds the pages open at once.
+            `checkpoint` (Checkpoint): The journal finished teams are recorded in. Default is None.
+            `database` (Database): The database the rosters are stored in. Default is None.
+            `export_mode` (str): The `JsonExporter` mode of the json file. Default is "pretty"."""
+        super().__init__(browser, checkpoint=checkpoint, database=database, export_mode=export_mode)
+        self._semaphore = semaphore
+
+    async def get_batters(self, num_batters: int, teams_playing: List[str]) -> List[Batter]:
+        """Get the batters for the teams playing.
+
+        Parameters:
+            `num_batters` (int): The number of batters to get from each team.
+            `teams_playing` (List[str]): The teams playing.
+
+        Returns:
+            `List[Batter]`: The batters, in the order of the teams directory."""
+        team_directory = self.get_teams(teams_playing)
+        rosters = await gather(*(self.get_team_batters(team, num_batters) for team in team_directory))
+        for roster in rosters:
+            self._batters.extend(roster)
+
+        self._export_to_json()
+        return self._batters
+
+    async def get_team_batters(self, team: dict, num_batters: int) -> List[Batter]:
+        """Get the top batters by hits of a single team. The team page is retried with a backoff,
+        a team that still fails is recorded in the checkpoint.
+
+        Parameters:
+            `team` (dict): The team dictionary.
+            `num_batters` (int): The number of batters to get from the team.
+
+        Returns:
+            `List[Batter]`: The batters of the team."""
+        team_code = team["team_code"]
+        restored = self._restore_team(team)
+        if restored is not None:
+            return restored
+
+        try:
+            rows = await with_backoff_async(lambda: self._get_rows_from_page(team_code, num_batters))
+        except Exception:
+            self._record_failed([team])
+            raise
+
+        batters = self._build_batters(rows, team)
+        self._record_team(team_code, batters)
+        return batters
+
+    async def _get_rows_from_page(self, team_code: str, num_batters: int) -> List[dict]:
+        """Open the team page, sort the batting table by hits and get the rows of the top batters.
+
+        Parameters:
+            `team_code` (str): The team code.
+            `num_batters` (int): The number of batters to get from the team.
+
+        Returns:
+            `List[dict]`: The player rows."""
+        readiness = self._browser.readiness
+        async with self._semaphore:
+            page = await self._browser.new_page()
+            try:
+                await self._browser.open_url(self._team_url(team_code), page)
+                print(f"Scraping {team_code}")
+                table = await readiness.wait_for_table(
+                    page, "#team_batting", fixed=self._browser._fixed_seconds(9, 3))
+                header = await table.wait_for_selector("[data-stat=H]", state="visible")
+                await header.click()
+                await readiness.wait_for_sorted(
+                    page, "#team_batting", "H", fixed=self._browser._fixed_seconds(3, 3))
+                return await table.eval_on_selector_all(
+                    ROW_SELECTOR, EXTRACT_ROWS, [["player"], num_batters])
+            finally:
+                await page.close()
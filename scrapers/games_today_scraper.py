@@ -1,16 +1,38 @@
-from typing import List, Tuple
+import re
+from typing import List, Set, Tuple
 from components.browser import Browser
+from components.scheduled_game import ScheduledGame, SCHEDULED, LIVE, FINAL, POSTPONED
+from components.schedule_provider import ScheduleProvider
+from components.team_directory import TeamDirectory
 from playwright.sync_api import ElementHandle
 from datetime import datetime
 from os import name
 
+SECTION_LABEL = ".ScheduleCollectionGridstyle__SectionLabelContainer-sc-c0iua4-3"
+SECTION_WRAPPER = ".ScheduleCollectionGridstyle__SectionWrapper-sc-c0iua4-0"
+GAME_WRAPPER = ".ScheduleGamestyle__DesktopScheduleGameWrapper-sc-b76vp3-0"
+AWAY_WRAPPER = ".TeamMatchupLayerstyle__AwayWrapper-sc-ouprud-1"
+HOME_WRAPPER = ".TeamMatchupLayerstyle__HomeWrapper-sc-ouprud-2"
+TEAM_WRAPPER = ".TeamWrappersstyle__DesktopTeamWrapper-sc-uqs6qh-0"
 
-class GamesTodayScraper:
+class GamesTodayScraper(ScheduleProvider):
+    """Schedule provider that renders the MLB.com schedule page, used as the fallback of the
+    stats api. The teams as named on the page are resolved through the teams directory."""
     _browser: Browser
-    _teams: List[str] = []
+    _teams: Set[str]
+    _day: datetime
+    _directory: TeamDirectory
 
-    def __init__(self, browser: Browser):
+    def __init__(self, browser: Browser, day: datetime = None):
+        """Initialize the scraper.
+
+        Parameters:
+            `browser` (Browser): The browser instance.
+            `day` (datetime): The day to get the games of. Default is today."""
         self._browser = browser
+        self._teams = set()
+        self._day = day or datetime.today()
+        self._directory = TeamDirectory.load()
 
     def get_games(self) -> Tuple[bool, List[str]]:
         """
@@ -26,74 +48,118 @@ class GamesTodayScraper:
         - False if there are no games today
         - An empty list if there are no games today
         """
-        today = datetime.today().strftime('%Y-%m-%d')
-        self._browser.open_url(f"https://www.mlb.com/schedule/{today}")
-        self._browser._wait(8, 5)
-        has_games = self._has_games_today()
-        if has_games:
-            schedule = self._get_schedule()
-            games = self._get_baseball_games(schedule)
+        games = self.get_schedule()
+        if games:
             for game in games:
-                away, home = self._get_baseball_teams(game)
-                self._add_to_teams(away)
-                self._add_to_teams(home)
+                for team in game.get_teams():
+                    self._add_to_teams(team)
 
-            self._teams.sort()
-            return (has_games, self._teams)
+            return (True, sorted(self._teams))
 
         print("No games today")
-        return (has_games, [])
+        return (False, [])
+
+    def get_schedule(self) -> List[ScheduledGame]:
+        """Opens the MLB.com schedule page and returns today's games with their start times
+        and statuses. Can be called again to refresh the statuses.
+
+        Returns:
+            `List[ScheduledGame]`: The games, empty if there are no games today."""
+        today = self._day.strftime('%Y-%m-%d')
+        self._browser.open_url(f"https://www.mlb.com/schedule/{today}")
+        self._wait_for_schedule()
+        if not self._has_games_today():
+            return []
+
+        scheduled_games: List[ScheduledGame] = []
+        schedule = self._get_schedule()
+        for game in self._get_baseball_games(schedule):
+            away, home = self._get_baseball_teams(game)
+            start, status = self._get_game_state(game.inner_text())
+            scheduled_games.append(ScheduledGame(away, home, start, status))
+        return scheduled_games
+
+    def _wait_for_schedule(self) -> None:
+        """Waits until the schedule label is rendered and the network has gone quiet."""
+        page = self._browser.page
+        readiness = self._browser.readiness
+        readiness.wait_for_selector(page, SECTION_LABEL, self._browser._fixed_seconds(8, 5))
+        readiness.wait_for_network_idle(page)
 
     def _add_to_teams(self, team: str):
-        """Adds a team to the list of teams that have games today if it is not already in the list."""
-        if team not in self._teams:
-            self._teams.append(team)
+        """Adds a team to the teams that have games today."""
+        self._teams.add(team)
 
     def today_date(self):
         """Returns the current date as a string. Ex: TUESDAY JANUARY 1"""
         if name == "nt":
-            return datetime.today().strftime('%A %B %#d').upper()
+            return self._day.strftime('%A %B %#d').upper()
         else:
-            return datetime.today().strftime('%A %B %-d').upper()
+            return self._day.strftime('%A %B %-d').upper()
 
     def _has_games_today(self) -> bool:
         """Returns True if there are games today."""
-        day = self._browser.page.locator(
-            ".ScheduleCollectionGridstyle__SectionLabelContainer-sc-c0iua4-3").all_inner_texts()[0].replace("\n", " ").strip()
+        day = self._browser.page.locator(SECTION_LABEL).all_inner_texts()[0]
+        return self._is_today(day)
 
-        if day == self.today_date():
+    def _is_today(self, day: str) -> bool:
+        """Returns True if the schedule label is today's date.
+
+        Parameters:
+            `day` (str): The text of the schedule label."""
+        if day.replace("\n", " ").strip() == self.today_date():
             return True
 
         return False
 
     def _get_schedule(self) -> ElementHandle:
         """Returns the schedule element."""
-        schedule = self._browser.page.wait_for_selector(
-            ".ScheduleCollectionGridstyle__SectionWrapper-sc-c0iua4-0", timeout=0, state="visible")
-        return schedule
+        return self._browser.readiness.wait_for_selector(self._browser.page, SECTION_WRAPPER)
 
     def _get_baseball_games(self, schedule: ElementHandle) -> ElementHandle:
         """Returns the games element."""
-        games = schedule.query_selector_all(
-            ".ScheduleGamestyle__DesktopScheduleGameWrapper-sc-b76vp3-0")
+        games = schedule.query_selector_all(GAME_WRAPPER)
         return games
 
     def _get_baseball_teams(self, game: ElementHandle) -> List[str]:
         """Returns the home/away teams that play in the game."""
 
-        away_element = game.query_selector(
-            ".TeamMatchupLayerstyle__AwayWrapper-sc-ouprud-1")
-        home_element = game.query_selector(
-            ".TeamMatchupLayerstyle__HomeWrapper-sc-ouprud-2")
+        away_element = game.query_selector(AWAY_WRAPPER)
+        home_element = game.query_selector(HOME_WRAPPER)
+
+        away = away_element.query_selector(TEAM_WRAPPER).inner_text()
+        home = home_element.query_selector(TEAM_WRAPPER).inner_text()
+
+        return (self._clean_team_name(away), self._clean_team_name(home))
 
-        away = away_element.query_selector(
-            ".TeamWrappersstyle__DesktopTeamWrapper-sc-uqs6qh-0").inner_text()
-        home = home_element.query_selector(
-            ".TeamWrappersstyle__DesktopTeamWrapper-sc-uqs6qh-0").inner_text()
+    def _get_game_state(self, text: str) -> Tuple[datetime, str]:
+        """Returns the start time and status of a game from the text of its schedule row.
+        A game that has started shows the inning or "Final" instead of its start time.
 
-        if away == "D-backs":
-            away = "Diamondbacks"
-        if home == "D-backs":
-            home = "Diamondbacks"
+        Parameters:
+            `text` (str): The inner text of the game.
 
-        return (away, home)
+        Returns:
+            `Tuple[datetime, str]`: The start in local time or None, and the status."""
+        text = text.upper()
+        if re.search(r"POSTPONED|SUSPENDED|CANCELLED", text):
+            status = POSTPONED
+        elif re.search(r"\bFINAL\b|\bF/\d+", text):
+            status = FINAL
+        elif re.search(r"\b(TOP|BOT|MID|END)\b", text):
+            status = LIVE
+        else:
+            status = SCHEDULED
+
+        start = None
+        match = re.search(r"\b(\d{1,2}):(\d{2})\s*([AP])M\b", text)
+        if match is not None:
+            hour = int(match.group(1)) % 12 + (12 if match.group(3) == "P" else 0)
+            start = datetime.combine(self._day.date(), datetime.min.time()).replace(
+                hour=hour, minute=int(match.group(2)))
+        return start, status
+
+    def _clean_team_name(self, team: str) -> str:
+        """Returns the team code of the team as named on the page, the name itself if the
+        directory does not know it."""
+        return self._directory.get_code(team) or team
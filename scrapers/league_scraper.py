@@ -0,0 +1,167 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from components.batter import Batter
+from components.batters_game import BattersGame
+from components.fetcher import Fetcher
+from components.table_parser import parse_table
+from components.analytics import Analytics
+from components.backoff import with_backoff
+from components.team_directory import TeamDirectory
+
+BOXES_URL = "https://www.baseball-reference.com/boxes/?year={year}&month={month}&day={day}"
+BOX_SCORE_LINK = re.compile(r'href="(/boxes/[A-Z]{3}/[A-Z]{3}(\d{8})(\d)\.shtml)"')
+SCOREBOX_TEAM = re.compile(r'<strong>\s*<a[^>]*href="/teams/([A-Z]{3})/\d{4}\.shtml"[^>]*>([^<]+)</a>')
+
+
+class LeagueScraper:
+    """League wide mode. Instead of one gamelog page per batter the games of every batter are
+    read from the box scores of the last `days` days, one page per game covers both lineups.
+    Box scores do not change once the game is final, so the page cache keeps them and a daily
+    run only fetches the previous day's. The pages go through a work queue of `num_workers`
+    fetches at a time and the batters of the teams playing are ranked by the recent form
+    metric to pick the final ones."""
+    _fetcher: Fetcher
+    _num_workers: int
+    _days: int
+    _min_games: int
+    _rank_by: str
+    _day: datetime
+
+    def __init__(self, fetcher: Fetcher, num_workers: int = 4, days: int = 14, min_games: int = 5,
+                 rank_by: str = "hits_per_game_10", day: datetime = None):
+        """Parameters:
+            `fetcher` (Fetcher): The fetcher the pages are requested with, it should have a page cache
+            and a rate limiter.
+            `num_workers` (int): The number of pages fetched at once. Default is 4.
+            `days` (int): The days of box scores read, before `day`. Default is 14.
+            `min_games` (int): The least games with an at bat a batter needs to be ranked,
+            leaves out pitchers and bench players. Default is 5.
+            `rank_by` (str): The `Analytics` metric the batters are ranked by. Default is "hits_per_game_10".
+            `day` (datetime): The day the batters are picked for. Default is today."""
+        self._fetcher = fetcher
+        self._num_workers = max(1, num_workers)
+        self._days = days
+        self._min_games = min_games
+        self._rank_by = rank_by
+        self._day = day or datetime.today()
+
+    def get_batters(self, teams: List[dict], num_batters: int) -> List[Batter]:
+        """Gets the best batters in recent form of the teams playing.
+
+        Parameters:
+            `teams` (List[dict]): The teams directory entries of the teams playing.
+            `num_batters` (int): The number of batters to pick.
+
+        Returns:
+            `List[Batter]`: The picked batters, ranked."""
+        box_scores = [box_score for day_boxes in self._map(self._get_box_scores, self._get_days())
+                      for box_score in day_boxes]
+        print(f"Reading {len(box_scores)} box scores")
+        lines = [line for box_lines in self._map(self._get_box_score_lines, box_scores) for line in box_lines]
+
+        batters = self._build_batters(lines, {team["team_code"]: team for team in teams})
+        batters = [batter for batter in batters if self._games_with_at_bats(batter) >= self._min_games]
+        print(f"Ranking {len(batters)} batters")
+        return Analytics(batters).rank(self._rank_by)[0:num_batters]
+
+    def _map(self, action, items: list) -> list:
+        """Runs the action on every item with retries, `num_workers` at a time.
+
+        Parameters:
+            `action` (Callable): The action to run on each item.
+            `items` (list): The items.
+
+        Returns:
+            `list`: The results, in the order of the items."""
+        with ThreadPoolExecutor(max_workers=self._num_workers) as executor:
+            return list(executor.map(lambda item: with_backoff(lambda: action(item)), items))
+
+    def _get_days(self) -> List[datetime]:
+        """Returns the days to read the box scores of, newest first."""
+        return [self._day - timedelta(days=offset) for offset in range(1, self._days + 1)]
+
+    def _get_box_scores(self, day: datetime) -> List[Tuple[str, str, int]]:
+        """Gets the box scores of the games of the day.
+
+        Parameters:
+            `day` (datetime): The day.
+
+        Returns:
+            `List[Tuple[str, str, int]]`: The url, date and game of the day of each box score."""
+        html = self._fetcher.get_html(BOXES_URL.format(year=day.year, month=day.month, day=day.day))
+        box_scores: Dict[str, Tuple[str, str, int]] = {}
+        for link, date, game_number in BOX_SCORE_LINK.findall(html):
+            date = f"{date[0:4]}-{date[4:6]}-{date[6:8]}"
+            box_scores[link] = (f"https://www.baseball-reference.com{link}", date, max(1, int(game_number)))
+        return list(box_scores.values())
+
+    def _get_box_score_lines(self, box_score: Tuple[str, str, int]) -> List[Tuple[str, str, str, BattersGame]]:
+        """Gets the batting lines of both teams of a box score, none if the page does not look
+        like a box score.
+
+        Parameters:
+            `box_score` (Tuple[str, str, int]): The url, date and game of the day of the box score.
+
+        Returns:
+            `List[Tuple[str, str, str, BattersGame]]`: The id, name and team code of the batter with
+            the game, for every batting line."""
+        url, date, game_number = box_score
+        html = self._fetcher.get_html(url)
+        scorebox_teams = SCOREBOX_TEAM.findall(html)
+        if len(scorebox_teams) < 2:
+            print(f"Skipping {url}, the box score does not show both teams")
+            return []
+        (away_code, away_name), (home_code, home_name) = scorebox_teams[0:2]
+        directory = TeamDirectory.load()
+
+        lines: List[Tuple[str, str, str, BattersGame]] = []
+        for code, team_name, team_played in [(away_code, away_name, f"@{home_code}"),
+                                             (home_code, home_name, away_code)]:
+            team_code = directory.get_code(code) or directory.get_code(team_name)
+            for row in parse_table(html, self._batting_table_id(team_name)):
+                player = row.get("player", {})
+                id = player.get("data-append-csv")
+                if not id or "H" not in row or "AB" not in row:
+                    continue
+                hits = int(row["H"]["text"] or 0)
+                at_bats = int(row["AB"]["text"] or 0)
+                game = BattersGame(date, team_played, hits, at_bats, game_number)
+                lines.append((id, player["link"] or player["text"], team_code, game))
+        return lines
+
+    def _batting_table_id(self, team_name: str) -> str:
+        """Returns the id of the batting table of the team in a box score.
+        Ex: "St. Louis Cardinals" -> "StLouisCardinalsbatting"."""
+        return re.sub(r"[^A-Za-z]", "", team_name) + "batting"
+
+    def _build_batters(self, lines: List[Tuple[str, str, str, BattersGame]],
+                       teams: Dict[str, dict]) -> List[Batter]:
+        """Groups the batting lines by batter. A batter belongs to the team of their newest game
+        and is left out unless that team is playing.
+
+        Parameters:
+            `lines` (List[Tuple[str, str, str, BattersGame]]): The batting lines.
+            `teams` (Dict[str, dict]): The teams playing, keyed by team code.
+
+        Returns:
+            `List[Batter]`: The batters of the teams playing with their games."""
+        by_id: Dict[str, List[Tuple[str, str, BattersGame]]] = {}
+        for id, name, team_code, game in lines:
+            by_id.setdefault(id, []).append((name, team_code, game))
+
+        batters: List[Batter] = []
+        for id, batter_lines in by_id.items():
+            batter_lines.sort(key=lambda line: line[2].get_key(), reverse=True)
+            name, team_code, _ = batter_lines[0]
+            if team_code not in teams:
+                continue
+            batter = Batter(id, name, teams[team_code])
+            batter.add_games([game for _, _, game in batter_lines])
+            batters.append(batter)
+        return batters
+
+    def _games_with_at_bats(self, batter: Batter) -> int:
+        """Returns the games in the batter's window that had an at bat."""
+        return sum(1 for game in batter.get_batting_games() if game.get_at_bats() > 0)
@@ -1,126 +1,473 @@
-import json
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from os.path import splitext
+from typing import Dict, List, Set, Tuple
 from components.browser import Browser
-from playwright.sync_api import ElementHandle
+from playwright.sync_api import ElementHandle, Page
 from components.batters_game import BattersGame
 from components.batter import Batter
+from components.fetcher import Fetcher
+from components.table_parser import parse_table
+from components.table_extractor import extract_rows
+from components.gamelog_store import GamelogStore
+from components.analytics import Analytics
+from components.checkpoint import Checkpoint
+from components.database import Database
+from components.json_exporter import JsonExporter, export_batters
+from components.backoff import with_backoff
+
+GAME_STATS = ["date_game", "team_homeORaway", "opp_ID", "H", "AB"]
 
 
 class StatsScraper:
     _browser: Browser
-    _batters: List[Batter] = []
+    _fetcher: Fetcher
+    _batters: List[Batter]
+    _num_pages: int
+    _next_games: Dict[str, datetime]
+    _store: GamelogStore
+    _last_games: Dict[str, str]
+    _rank_by: str
+    _checkpoint: Checkpoint
+    _completed: Set[str]
+    _database: Database
+    _export_mode: str
+    _export_path: str
+    _progress: JsonExporter
+
+    def __init__(self, browser: Browser = None, num_pages: int = 1, fetcher: Fetcher = None,
+                 next_games: Dict[str, datetime] = None, store: GamelogStore = None,
+                 last_games: Dict[str, str] = None, rank_by: str = "hits_per_game_10",
+                 checkpoint: Checkpoint = None, database: Database = None, export_mode: str = "pretty",
+                 export_path: str = "data/batters.json"):
+        """Initialize the scraper. When a fetcher is given the gamelog pages are fetched
+        and parsed without the browser. When a store is given only the games newer than the
+        stored ones are merged in. When a database is given the batters and the day's ranking
+        are saved in it instead of rewriting the json file, it can be the store as well.
+        Every batter is written to the ndjson progress file next to the json file as soon as it
+        is scraped, its `.part` file can be tailed during the run.
 
-    def __init__(self, browser: Browser):
+        Parameters:
+            `browser` (Browser): The browser instance.
+            `num_pages` (int): The number of pages to scrape batters on at once. Default is 1.
+            `fetcher` (Fetcher): The fetcher instance. Default is None.
+            `next_games` (Dict[str, datetime]): The start of each team's next game, keyed by team code.
+            A cached gamelog is kept until then. Default is None.
+            `store` (GamelogStore): The stored game history. Default is None.
+            `last_games` (Dict[str, str]): The date of each team's last game, keyed by team code.
+            Batters whose stored games already reach it are not scraped. Default is None.
+            `rank_by` (str): The `Analytics` metric the batters are ranked by. Default is "hits_per_game_10".
+            `checkpoint` (Checkpoint): The journal finished batters are recorded in. Default is None.
+            `database` (Database): The database the batters and rankings are stored in. Default is None.
+            `export_mode` (str): The `JsonExporter` mode of the json file. Default is "pretty".
+            `export_path` (str): The json file the ranked batters are written to. Default is "data/batters.json"."""
         self._browser = browser
+        self._fetcher = fetcher
+        self._batters = []
+        self._num_pages = max(1, num_pages)
+        self._next_games = next_games or {}
+        self._store = store
+        self._last_games = last_games or {}
+        self._rank_by = rank_by
+        self._checkpoint = checkpoint
+        self._completed = set()
+        self._database = database
+        self._export_mode = export_mode
+        self._export_path = export_path
+        self._progress = None
+
+    def set_schedule(self, next_games: Dict[str, datetime], last_games: Dict[str, str]) -> None:
+        """Replaces the schedule the gamelog cache and the skipping of batters are based on.
+        Used by the scheduler as the statuses of today's games change.
+
+        Parameters:
+            `next_games` (Dict[str, datetime]): The start of each team's next game, keyed by team code.
+            `last_games` (Dict[str, str]): The date of each team's last game, keyed by team code."""
+        self._next_games = next_games
+        self._last_games = last_games
 
     def get_stats(self, batters: List[Batter]) -> List[Batter]:
         """Adds the stats to the batters previously scraped.
+        Batters are worked through in waves of `num_pages`, every page of a wave loads
+        at the same time so the waits overlap.
 
         Parameters:
             `batters` (List[Batter]): The batters to add the stats to.
 
         Returns:
             `batters` (List[Batter]): The batters with the stats added."""
-        batters_list = batters
-        for batter in batters_list:
-            id, name, team_name = batter.get_url_info()
-            self._open_batters_page(id, name, team_name)
-            batting_table = self._get_table("#div_batting_gamelogs")
-            rows = self._get_game_rows(batting_table, 10)
-            batting_games: List[BattersGame] = []
-            for row in rows:
-                date = self._get_date(row)
-                team_played = self._get_opponent(row)
-                hits = self._get_data_value(row, "H")
-                at_bats = self._get_data_value(row, "AB")
-                batter_game = BattersGame(date, team_played, hits, at_bats)
-                batting_games.append(batter_game)
+        self.scrape_batters(batters)
+        return self.finish(batters)
 
-            batter.add_games(batting_games)
-        self._batters = batters
-        self._batters.sort(key=lambda x: x.moving_average, reverse=True)
+    def scrape_batters(self, batters: List[Batter]) -> None:
+        """Adds the games to the batters without ranking or exporting them. Used to scrape
+        the batters in batches and `finish` them together.
+
+        Parameters:
+            `batters` (List[Batter]): The batters to add the games to."""
+        self._start_progress()
+        batters_to_scrape = self._restore_checkpointed(self._load_stored_games(batters))
+        if self._fetcher is not None:
+            self._scrape_html(batters_to_scrape)
+        else:
+            self._scrape_pages(batters_to_scrape)
+
+    def finish(self, batters: List[Batter]) -> List[Batter]:
+        """Stores the games, ranks the batters by the recent form metric and exports them.
+
+        Parameters:
+            `batters` (List[Batter]): The batters with the stats added.
+
+        Returns:
+            `batters` (List[Batter]): The sorted batters."""
+        if self._store is not None:
+            self._store.update(batters)
+        self._batters = Analytics(batters).rank(self._rank_by)
+        batters[:] = self._batters
+        if self._progress is not None:
+            self._progress.close()
+            self._progress = None
         self._export_to_json()
-        return batters_list
+        return batters
+
+    def _start_progress(self) -> None:
+        """Opens the progress file, unless the batters of an earlier batch are still being written to it."""
+        if self._progress is None:
+            self._progress = JsonExporter(splitext(self._export_path)[0] + ".progress.ndjson", "ndjson")
+            self._progress.open()
+
+    def _load_stored_games(self, batters: List[Batter]) -> List[Batter]:
+        """Adds the stored games to the batters and leaves out the batters whose team has
+        not played since their newest stored game.
+
+        Parameters:
+            `batters` (List[Batter]): The batters to load the games of.
+
+        Returns:
+            `batters` (List[Batter]): The batters that still have to be scraped."""
+        if self._store is None:
+            return batters
+
+        batters_to_scrape: List[Batter] = []
+        for batter in batters:
+            id = batter.get_id()
+            if self._store.has(id):
+                batter.add_games(self._store.get_games(id))
+                last_game = self._last_games.get(batter.get_team_code())
+                if last_game is not None and self._store.last_key(id)[0] >= last_game:
+                    print(f"Skipping {batter.get_name()}, no new games")
+                    continue
+            batters_to_scrape.append(batter)
+        return batters_to_scrape
+
+    def _restore_checkpointed(self, batters: List[Batter]) -> List[Batter]:
+        """Adds the games of the batters finished by a previous run from the checkpoint.
+
+        Parameters:
+            `batters` (List[Batter]): The batters to restore.
+
+        Returns:
+            `batters` (List[Batter]): The batters that still have to be scraped."""
+        if self._checkpoint is None:
+            return batters
+
+        batters_to_scrape: List[Batter] = []
+        for batter in batters:
+            id = batter.get_id()
+            if not self._checkpoint.is_done("batter", id):
+                batters_to_scrape.append(batter)
+                continue
+            print(f"Restoring {batter.get_name()}")
+            games = self._checkpoint.get("batter", id)["games"]
+            self._add_games(batter, [BattersGame(game["date"], game["team_played"], game["hits"],
+                                                 game["at_bats"], game["game_number"]) for game in games])
+        return batters_to_scrape
+
+    def _record(self, batter: Batter, batting_games: List[BattersGame]) -> None:
+        """Records the scraped games of the batter in the checkpoint.
+
+        Parameters:
+            `batter` (Batter): The batter that was scraped.
+            `batting_games` (List[BattersGame]): The scraped games, newest first."""
+        if self._checkpoint is None:
+            return
+        self._checkpoint.record("batter", batter.get_id(), "done", games=[
+            dict(game.to_dict(), game_number=game.get_game_number()) for game in batting_games])
+
+    def _record_failed(self, batters: List[Batter]) -> None:
+        """Records the batters that could not be scraped in the checkpoint.
+
+        Parameters:
+            `batters` (List[Batter]): The batters that failed."""
+        if self._checkpoint is None:
+            return
+        for batter in batters:
+            if batter.get_id() not in self._completed:
+                self._checkpoint.record("batter", batter.get_id(), "failed")
+
+    def _complete(self, batter: Batter, batting_games: List[BattersGame]) -> None:
+        """Adds the scraped games to the batter, records it as finished and writes it to the progress file.
+
+        Parameters:
+            `batter` (Batter): The batter that was scraped.
+            `batting_games` (List[BattersGame]): The scraped games, newest first."""
+        self._add_games(batter, batting_games)
+        self._record(batter, batting_games)
+        self._completed.add(batter.get_id())
+        if self._progress is not None:
+            self._progress.write(batter.to_dict())
+
+    def _add_games(self, batter: Batter, batting_games: List[BattersGame]) -> None:
+        """Adds the scraped games to the batter. With a store only the games newer than the
+        newest stored game are merged in.
+
+        Parameters:
+            `batter` (Batter): The batter to add the games to.
+            `batting_games` (List[BattersGame]): The scraped games, newest first."""
+        last_key = self._store.last_key(batter.get_id()) if self._store is not None else None
+        if last_key is None:
+            batter.add_games(batting_games)
+            return
+        batter.merge_games([game for game in batting_games if game.get_key() > last_key])
+
+    def _scrape_pages(self, batters: List[Batter]) -> None:
+        """Scrapes the games of the batters in the browser, `num_pages` batters at a time.
+        The browser is checked between waves and restarted when it is unhealthy.
+
+        Parameters:
+            `batters` (List[Batter]): The batters to scrape."""
+        pages = self._open_pages()
+        try:
+            for start in range(0, len(batters), len(pages)):
+                if start > 0 and self._browser.ensure_healthy():
+                    pages = self._open_pages()
+                wave = list(zip(pages, batters[start:start + len(pages)]))
+                try:
+                    with_backoff(lambda: self._scrape_wave(wave))
+                except Exception:
+                    self._record_failed([batter for _, batter in wave])
+                    raise
+        finally:
+            self._close_pages(pages)
+
+    def _scrape_html(self, batters: List[Batter]) -> None:
+        """Scrapes the games of the batters without the browser, `num_pages` batters at a time.
+        Each batter is completed as soon as its page is in, a failed one does not hold up the others.
 
-    def _open_batters_page(self, id: str, name: str, team_name: str) -> None:
+        Parameters:
+            `batters` (List[Batter]): The batters to scrape."""
+        failure = None
+        with ThreadPoolExecutor(max_workers=self._num_pages) as executor:
+            futures = {executor.submit(self._fetch_games, batter): batter for batter in batters}
+            for future in as_completed(futures):
+                try:
+                    self._complete(futures[future], future.result())
+                except Exception as exception:
+                    failure = failure or exception
+        if failure is not None:
+            raise failure
+
+    def _fetch_games(self, batter: Batter) -> List[BattersGame]:
+        """Fetches the games of the batter with retries, a batter that still fails is recorded in the checkpoint.
+
+        Parameters:
+            `batter` (Batter): The batter to get the games of.
+
+        Returns:
+            `List[BattersGame]`: The games of the batter."""
+        try:
+            batting_games = with_backoff(lambda: self._get_games_from_html(batter))
+        except Exception:
+            self._record_failed([batter])
+            raise
+        return batting_games
+
+    def _get_games_from_html(self, batter: Batter) -> List[BattersGame]:
+        """Fetches the gamelog page of the batter and parses the last 10 games, newest first.
+
+        Parameters:
+            `batter` (Batter): The batter to get the games of.
+
+        Returns:
+            `List[BattersGame]`: The games of the batter."""
+        id, name, team_name = batter.get_url_info()
+        next_game = self._next_games.get(batter.get_team_code())
+        html = self._fetcher.get_html(self._batters_url(id), next_game)
+        print(f"Scraping {name} from {team_name}")
+        rows = [row for row in parse_table(html, "#div_batting_gamelogs")
+                if row.get("date_game", {}).get("csk")]
+        rows.sort(key=lambda row: row["date_game"]["csk"], reverse=True)
+        return self._build_games(rows[0:10])
+
+    def _batters_url(self, id: str) -> str:
+        """Gets the url of the batters gamelog page.
+
+        Parameters:
+            `id` (str): The player's id.
+
+        Returns:
+            `url` (str): The gamelog page url."""
+        return f"https://www.baseball-reference.com/players/gl.fcgi?id={id}&t=b&year=2022"
+
+    def _scrape_wave(self, wave: List[Tuple[Page, Batter]]) -> None:
+        """Scrapes the games of every batter in the wave, each batter on its own page.
+        Batters finished by an earlier attempt of the wave are left out.
+
+        Parameters:
+            `wave` (List[Tuple[Page, Batter]]): The pages paired with the batter to scrape on them."""
+        wave = [(page, batter) for page, batter in wave if batter.get_id() not in self._completed]
+        for page, batter in wave:
+            id, name, team_name = batter.get_url_info()
+            self._open_batters_page(page, id, name, team_name)
+
+        tables = [self._get_table(page, "#div_batting_gamelogs") for page, _ in wave]
+        self._sort_by_date([page for page, _ in wave], tables)
+
+        for table, (_, batter) in zip(tables, wave):
+            rows = self._get_game_rows(table, 10)
+            self._complete(batter, self._build_games(rows))
+
+    def _build_games(self, rows: List[dict]) -> List[BattersGame]:
+        """Builds the games from the extracted rows of the games table.
+
+        Parameters:
+            `rows` (List[dict]): The rows of the games table.
+
+        Returns:
+            `batting_games` (List[BattersGame]): The games."""
+        batting_games: List[BattersGame] = []
+        for row in rows:
+            date = self._get_date(row)
+            team_played = self._get_opponent(row)
+            hits = self._get_data_value(row, "H")
+            at_bats = self._get_data_value(row, "AB")
+            game_number = self._get_game_number(row)
+            batting_games.append(BattersGame(date, team_played, hits, at_bats, game_number))
+        return batting_games
+
+    def _open_pages(self) -> List[Page]:
+        """Opens the pages used to scrape the batters. The first one is the browser's main page.
+
+        Returns:
+            `pages` (List[Page]): The pages to scrape on."""
+        pages = [self._browser.page]
+        for _ in range(self._num_pages - 1):
+            pages.append(self._browser.new_page())
+        return pages
+
+    def _close_pages(self, pages: List[Page]) -> None:
+        """Closes the extra pages opened by `_open_pages`, the main page is kept open.
+
+        Parameters:
+            `pages` (List[Page]): The pages to close."""
+        for page in pages[1:]:
+            page.close()
+
+    def _open_batters_page(self, page: Page, id: str, name: str, team_name: str) -> None:
         """Opens the batters page for the given player.
         Ex: https://www.baseball-reference.com/players/gl.fcgi?id=`id`&t=b&year=2022
 
         Parameters:
+            `page` (Page): The page to open the batters page in.
             `id` (str): The player's id.
             `name` (str): The player's name.
             `team_name` (str): The player's team name."""
-        self._browser.open_url(
-            f"https://www.baseball-reference.com/players/gl.fcgi?id={id}&t=b&year=2022")
+        self._browser.open_url(self._batters_url(id), page)
         print(f"Scraping {name} from {team_name}")
-        self._browser._wait(6, 3)
 
-    def _get_table(self, table_id: str) -> ElementHandle:
+    def _get_table(self, page: Page, table_id: str) -> ElementHandle:
         """Gets the table with the given id.
 
         Parameters:
+            `page` (Page): The page to get the table from.
             `table_id` (str): The id of the table to get.
 
         Returns:
             `table` (ElementHandle): The table with the given id."""
-        table = self._browser.page.wait_for_selector(table_id, timeout=0, state="visible")
-        date_column = table.query_selector(f"[data-stat='date_game']")
-        for _ in range(2):
-            date_column.click()
-            self._browser._wait(1, 0.5)
-        return table
+        return self._browser.readiness.wait_for_table(
+            page, table_id, fixed=self._browser._fixed_seconds(6, 3))
+
+    def _sort_by_date(self, pages: List[Page], tables: List[ElementHandle]) -> None:
+        """Sorts the tables by date, newest first. The date column is clicked twice on
+        every table, then waits until each table is sorted.
+
+        Parameters:
+            `pages` (List[Page]): The pages the tables are on.
+            `tables` (List[ElementHandle]): The tables to sort."""
+        for table in tables:
+            date_column = table.query_selector("[data-stat='date_game']")
+            for _ in range(2):
+                date_column.click()
+
+        for page in pages:
+            self._browser.readiness.wait_for_sorted(
+                page, "#div_batting_gamelogs", "date_game", fixed=self._browser._fixed_seconds(2, 1))
 
-    def _get_game_rows(self, table: ElementHandle, games_amount: int) -> List[ElementHandle]:
-        """Gets the rows of the games table.
+    def _get_game_rows(self, table: ElementHandle, games_amount: int) -> List[dict]:
+        """Gets the rows of the games table in a single call to the browser.
 
         Parameters:
             `table` (ElementHandle): The table to get the rows from.
             `games_amount` (int): The amount of games to get.
 
         Returns:
-            `rows` (List[ElementHandle]): The rows of the games table."""
-        rows = table.query_selector_all("tbody tr")[0:games_amount]
-        return rows
+            `rows` (List[dict]): The rows of the games table."""
+        return extract_rows(table, GAME_STATS, games_amount)
 
-    def _get_date(self, row: ElementHandle) -> str:
+    def _get_date(self, row: dict) -> str:
         """Gets the date of the game.
 
         Parameters:
-            `row` (ElementHandle): The row to get the date from.
+            `row` (dict): The row to get the date from.
 
         Returns:
             `date` (str): The date of the game."""
-        date_element = row.query_selector("[data-stat='date_game']")
-        date = date_element.get_attribute("csk").split(".")[0]
-        return date
+        return row["date_game"]["csk"].split(".")[0]
+
+    def _get_game_number(self, row: dict) -> int:
+        """Gets the game of the day, the date sort key ends with it on doubleheaders.
+
+        Parameters:
+            `row` (dict): The row to get the game number from.
+
+        Returns:
+            `game_number` (int): The game of the day."""
+        parts = row["date_game"]["csk"].split(".")
+        if len(parts) > 1 and parts[1].isdigit() and int(parts[1]) > 0:
+            return int(parts[1])
+        return 1
 
-    def _get_data_value(self, row: ElementHandle, data_type: str) -> str:
+    def _get_data_value(self, row: dict, data_type: str) -> int:
         """Gets the data value of the given type.
 
         Parameters:
-            `row` (ElementHandle): The row to get the data from.
+            `row` (dict): The row to get the data from.
             `data_type` (str): The type of data to get.
 
         Returns:
-            `data_value` (str): The data value of the given type."""
-        data_element = row.query_selector(f"[data-stat='{data_type}']")
-        return int(data_element.inner_text())
+            `data_value` (int): The data value of the given type."""
+        return int(row[data_type]["text"])
 
-    def _get_opponent(self, row: ElementHandle) -> str:
+    def _get_opponent(self, row: dict) -> str:
         """Gets the opponent of the game.
 
         Parameters:
-            `row` (ElementHandle): The row to get the opponent from.
+            `row` (dict): The row to get the opponent from.
 
         Returns:
             `opponent` (str): The opponent of the game."""
-        opponent = row.query_selector(f"[data-stat='opp_ID']").inner_text()
-        home_away = row.query_selector(
-            "[data-stat='team_homeORaway']").inner_text()
+        opponent = row["opp_ID"]["text"]
+        home_away = row["team_homeORaway"]["text"]
 
         return f"{home_away}{opponent}"
 
     def _export_to_json(self) -> None:
-        """Exports the batters to a json file."""
-        with open("data/batters.json", "w+", encoding='UTF-8') as file:
-            json.dump([bat.to_dict()for bat in self._batters], file, indent=2)
+        """Exports the batters to a json file. When there is a database the ranking is saved in it
+        first and the file is written from it."""
+        if self._database is not None:
+            if self._store is not self._database:
+                self._database.upsert_batters(self._batters)
+            self._database.save_ranking(self._batters)
+            self._database.export_json(self._export_path, mode=self._export_mode)
+            return
+        export_batters(self._batters, self._export_path, self._export_mode)
@@ -1,108 +1,323 @@
-import json
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
 from components.browser import Browser
-from playwright.sync_api import ElementHandle
+from playwright.sync_api import ElementHandle, Page
 from components.batter import Batter
+from components.fetcher import Fetcher
+from components.table_parser import parse_table
+from components.table_extractor import extract_rows
+from components.checkpoint import Checkpoint
+from components.database import Database
+from components.json_exporter import export_batters
+from components.backoff import with_backoff
+from components.team_directory import TeamDirectory
 
 
 class TeamsScraper:
     _browser: Browser
-    _batters: List[Batter] = []
-
-    def __init__(self, browser: Browser) -> None:
-        """Initialize the scraper.
+    _fetcher: Fetcher
+    _batters: List[Batter]
+    _checkpoint: Checkpoint
+    _database: Database
+    _export_mode: str
+    _num_pages: int
+
+    def __init__(self, browser: Browser = None, fetcher: Fetcher = None, checkpoint: Checkpoint = None,
+                 database: Database = None, export_mode: str = "pretty", num_pages: int = 1) -> None:
+        """Initialize the scraper. When a fetcher is given the team pages are fetched
+        and parsed without the browser. When a database is given the rosters are upserted
+        into it instead of rewriting the json file. Teams are scraped `num_pages` at a time,
+        the rosters are always merged in the order of the teams directory.
 
         Parameters:
-            `browser` (Browser): The browser instance."""
+            `browser` (Browser): The browser instance.
+            `fetcher` (Fetcher): The fetcher instance. Default is None.
+            `checkpoint` (Checkpoint): The journal finished teams are recorded in. Default is None.
+            `database` (Database): The database the rosters are stored in. Default is None.
+            `export_mode` (str): The `JsonExporter` mode of the json file. Default is "pretty".
+            `num_pages` (int): The number of teams to scrape at once, each on its own page or fetch. Default is 1."""
         self._browser = browser
+        self._fetcher = fetcher
+        self._batters = []
+        self._checkpoint = checkpoint
+        self._database = database
+        self._export_mode = export_mode
+        self._num_pages = max(1, num_pages)
 
     def get_batters(self, num_batters: int, teams_playing: List[str]) -> List[Batter]:
         """Get the batters for the teams playing.
 
         Parameters:
             `num_batters` (int): The number of batters to get from each team.
-            `teams_playing` (List[str]): The teams playing.
+            `teams_playing` (List[str]): The teams playing, as team codes or as named on the schedule.
 
         Returns:
             `List[Batter]`: The batters."""
 
         team_directory = self._get_teams_json(teams_playing)
 
+        rosters: Dict[str, List[Batter]] = {}
+        teams_to_scrape: List[dict] = []
         for team in team_directory:
-            team_code = team["team_code"]
-            self._open_team_page(team_code)
-            batting_table = self._get_table("#team_batting", "H")
-            batting_rows = self._get_player_rows(batting_table, num_batters)
-            self._add_batters(batting_rows, team)
+            restored = self._restore_team(team)
+            if restored is not None:
+                rosters[team["team_code"]] = restored
+            else:
+                teams_to_scrape.append(team)
+
+        if self._fetcher is not None:
+            self._fetch_teams(teams_to_scrape, num_batters, rosters)
+        else:
+            self._scrape_pages(teams_to_scrape, num_batters, rosters)
+
+        for team in team_directory:
+            self._batters.extend(rosters[team["team_code"]])
 
         self._export_to_json()
         return self._batters
 
-    def _add_batters(self, batter_rows: List[ElementHandle], team: dict) -> List[Batter]:
-        """Add the batter to the list of batters.
+    def get_teams(self, teams_playing: List[str]) -> List[dict]:
+        """Get the teams directory entries of the teams playing.
+
+        Parameters:
+            `teams_playing` (List[str]): The teams playing, as team codes or as named on the schedule.
+
+        Returns:
+            `List[dict]`: The teams playing."""
+        return self._get_teams_json(teams_playing)
+
+    def _fetch_teams(self, teams: List[dict], num_batters: int, rosters: Dict[str, List[Batter]]) -> None:
+        """Fetches the teams without the browser, `num_pages` at a time.
+
+        Parameters:
+            `teams` (List[dict]): The teams to scrape.
+            `num_batters` (int): The number of batters to get from each team.
+            `rosters` (Dict[str, List[Batter]]): The rosters keyed by team code, the scraped ones are added."""
+        with ThreadPoolExecutor(max_workers=self._num_pages) as executor:
+            scraped = list(executor.map(lambda team: self._get_team_batters(team, num_batters), teams))
+
+        for team, batters in zip(teams, scraped):
+            rosters[team["team_code"]] = batters
+
+    def _get_team_batters(self, team: dict, num_batters: int) -> List[Batter]:
+        """Fetch the batters of a team with retries and record them.
 
         Parameters:
-            `batter_rows` (List[ElementHandle]): The rows to cycle through.
+            `team` (dict): The team dictionary.
+            `num_batters` (int): The number of batters to get from the team.
+
+        Returns:
+            `List[Batter]`: The batters of the team."""
+        team_code = team["team_code"]
+        try:
+            batters = with_backoff(lambda: self._scrape_team(team, num_batters))
+        except Exception:
+            self._record_failed([team])
+            raise
+
+        self._record_team(team_code, batters)
+        return batters
+
+    def _scrape_pages(self, teams: List[dict], num_batters: int, rosters: Dict[str, List[Batter]]) -> None:
+        """Scrapes the teams in the browser, `num_pages` teams at a time, each on its own page.
+        The browser is checked between waves and restarted when it is unhealthy.
+
+        Parameters:
+            `teams` (List[dict]): The teams to scrape.
+            `num_batters` (int): The number of batters to get from each team.
+            `rosters` (Dict[str, List[Batter]]): The rosters keyed by team code, the scraped ones are added."""
+        pages = self._open_pages()
+        try:
+            for start in range(0, len(teams), len(pages)):
+                if start > 0 and self._browser.ensure_healthy():
+                    pages = self._open_pages()
+                wave = list(zip(pages, teams[start:start + len(pages)]))
+                try:
+                    with_backoff(lambda: self._scrape_wave(wave, num_batters, rosters))
+                except Exception:
+                    self._record_failed([team for _, team in wave if team["team_code"] not in rosters])
+                    raise
+        finally:
+            self._close_pages(pages)
+
+    def _scrape_wave(self, wave: List[Tuple[Page, dict]], num_batters: int,
+                     rosters: Dict[str, List[Batter]]) -> None:
+        """Scrapes every team in the wave, each team on its own page. All pages load at the same
+        time, then each table is sorted and read. Teams finished by an earlier attempt are left out.
+
+        Parameters:
+            `wave` (List[Tuple[Page, dict]]): The pages paired with the team to scrape on them.
+            `num_batters` (int): The number of batters to get from each team.
+            `rosters` (Dict[str, List[Batter]]): The rosters keyed by team code, the scraped ones are added."""
+        wave = [(page, team) for page, team in wave if team["team_code"] not in rosters]
+        for page, team in wave:
+            self._open_team_page(team["team_code"], page)
+
+        for page, team in wave:
+            batting_table = self._get_table(page, "#team_batting", "H")
+            batting_rows = self._get_player_rows(batting_table, num_batters)
+            batters = self._build_batters(batting_rows, team)
+            self._record_team(team["team_code"], batters)
+            rosters[team["team_code"]] = batters
+
+    def _open_pages(self) -> List[Page]:
+        """Opens the pages used to scrape the teams. The first one is the browser's main page.
+
+        Returns:
+            `pages` (List[Page]): The pages to scrape on."""
+        pages = [self._browser.page]
+        for _ in range(self._num_pages - 1):
+            pages.append(self._browser.new_page())
+        return pages
+
+    def _close_pages(self, pages: List[Page]) -> None:
+        """Closes the extra pages opened by `_open_pages`, the main page is kept open.
+
+        Parameters:
+            `pages` (List[Page]): The pages to close."""
+        for page in pages[1:]:
+            page.close()
+
+    def _record_failed(self, teams: List[dict]) -> None:
+        """Record the teams that could not be scraped in the checkpoint.
+
+        Parameters:
+            `teams` (List[dict]): The teams that failed."""
+        if self._checkpoint is None:
+            return
+        for team in teams:
+            self._checkpoint.record("team", team["team_code"], "failed")
+
+    def _restore_team(self, team: dict) -> List[Batter]:
+        """Get the batters of a team finished by a previous run from the checkpoint.
+
+        Parameters:
+            `team` (dict): The team dictionary.
+
+        Returns:
+            `List[Batter]`: The batters of the team, or None if the team is not finished."""
+        team_code = team["team_code"]
+        if self._checkpoint is None or not self._checkpoint.is_done("team", team_code):
+            return None
+        print(f"Restoring {team_code}")
+        record = self._checkpoint.get("team", team_code)
+        return [Batter(batter["id"], batter["name"], team) for batter in record["batters"]]
+
+    def _record_team(self, team_code: str, batters: List[Batter]) -> None:
+        """Record the batters of a finished team in the checkpoint.
+
+        Parameters:
+            `team_code` (str): The team code.
+            `batters` (List[Batter]): The batters of the team."""
+        if self._checkpoint is None:
+            return
+        self._checkpoint.record("team", team_code, "done", batters=[
+            {"id": batter.get_id(), "name": batter.get_name()} for batter in batters])
+
+    def _scrape_team(self, team: dict, num_batters: int) -> List[Batter]:
+        """Scrape the top batters by hits of a team with the fetcher.
+
+        Parameters:
+            `team` (dict): The team dictionary.
+            `num_batters` (int): The number of batters to get from the team.
+
+        Returns:
+            `List[Batter]`: The batters of the team."""
+        return self._build_batters(self._get_rows_from_html(team, num_batters), team)
+
+    def _build_batters(self, batter_rows: List[dict], team: dict) -> List[Batter]:
+        """Build the batters from the rows.
+
+        Parameters:
+            `batter_rows` (List[dict]): The rows to cycle through.
             `team` (dict): The team dictionary.
 
         Returns:
             `List[Batter]`: The batters."""
+        batters: List[Batter] = []
         for row in batter_rows:
             id, name = self._get_player_name(row)
-            player = Batter(id, name, team)
-            self._batters.append(player)
+            batters.append(Batter(id, name, team))
 
-        return self._batters
+        return batters
 
-    def _open_team_page(self, team_code: str):
+    def _get_rows_from_html(self, team: dict, num_batters: int) -> List[dict]:
+        """Fetch the team page without the browser, sort the batting table by hits and get
+        the rows of the top batters.
+
+        Parameters:
+            `team` (dict): The team dictionary.
+            `num_batters` (int): The number of batters to get from the team.
+
+        Returns:
+            `List[dict]`: The player rows."""
+        team_code = team["team_code"]
+        html = self._fetcher.get_html(self._team_url(team_code))
+        print(f"Scraping {team_code}")
+        rows = [row for row in parse_table(html, "#team_batting")
+                if "player" in row and row.get("H", {}).get("text", "").isdigit()]
+        rows.sort(key=lambda row: int(row["H"]["text"]), reverse=True)
+        return rows[0:num_batters]
+
+    def _team_url(self, team_code: str) -> str:
+        """Get the url of the team page.
+
+        Parameters:
+            `team_code` (str): The team code.
+
+        Returns:
+            `str`: The team page url."""
+        return f"https://www.baseball-reference.com/teams/{team_code}/2022.shtml"
+
+    def _open_team_page(self, team_code: str, page: Page = None):
         """Open the team page.
 
         Parameters:
-            `team_code` (str): The team code."""
-        self._browser.open_url(
-            f"https://www.baseball-reference.com/teams/{team_code}/2022.shtml")
+            `team_code` (str): The team code.
+            `page` (Page): The page to open the team page in. Default is the main page."""
+        self._browser.open_url(self._team_url(team_code), page)
         print(f"Scraping {team_code}")
-        self._browser._wait(9, 3)
 
-    def _get_table(self, table_id: str, data_stat: str) -> ElementHandle:
+    def _get_table(self, page: Page, table_id: str, data_stat: str) -> ElementHandle:
         """Get the table on webpage, and gets sorted by the data-stat.
-        The data-stat column is clicked to sort the table.
+        The data-stat column is clicked to sort the table, then waits until the rows are sorted.
 
         Parameters:
+            `page` (Page): The page to get the table from.
             `table_id` (str): The table id.
             `data_stat` (str): The data stat attribute.
 
         Returns:
             `ElementHandle`: The table."""
-        table = self._browser.page.wait_for_selector(f"{table_id}", timeout=0, state="visible")
-        table.wait_for_selector(f"[data-stat={data_stat}]", timeout=0, state="visible").click()
-        self._browser._wait(3, 3)
+        readiness = self._browser.readiness
+        table = readiness.wait_for_table(page, table_id, fixed=self._browser._fixed_seconds(9, 3))
+        table.wait_for_selector(f"[data-stat={data_stat}]", state="visible").click()
+        readiness.wait_for_sorted(page, table_id, data_stat, fixed=self._browser._fixed_seconds(3, 3))
         return table
 
-    def _get_player_rows(self, table: ElementHandle, players_amount) -> List[ElementHandle]:
-        """Get the player rows and get the amound of players.
+    def _get_player_rows(self, table: ElementHandle, players_amount) -> List[dict]:
+        """Get the player rows and get the amound of players in a single call to the browser.
 
         Parameters:
             `table` (ElementHandle): The table to get the rows from.
             `players_amount` (int): The amount of players to get.
 
         Returns:
-            `List[ElementHandle]`: The player rows from the table."""
-        rows = table.query_selector_all("tbody tr")[0:players_amount]
-        return rows
+            `List[dict]`: The player rows from the table."""
+        return extract_rows(table, ["player"], players_amount)
 
-    def _get_player_name(self, player_row: ElementHandle) -> Tuple[str, str]:
-        """Get the player name and id from ElementHandle and cleans the id with
+    def _get_player_name(self, player_row: dict) -> Tuple[str, str]:
+        """Get the player name and id from the row and cleans the id with
         the _clean_id function.
 
         Parameters:
-            `player_row` (ElementHandle): The row to get the name from.
+            `player_row` (dict): The row to get the name from.
 
         Returns:
             `Tuple[str, str]`: The player id and name."""
-        player = player_row.query_selector("[data-stat='player']")
-        id = player.get_attribute("data-append-csv")
-        name = player.query_selector("a").inner_text()
+        player = player_row["player"]
+        id = player["data-append-csv"]
+        name = player["link"] or player["text"]
 
         return self._clean_id(id), name
 
@@ -118,47 +333,20 @@ class TeamsScraper:
         return id.split("/")[-1]
 
     def _export_to_json(self) -> None:
-        """Export the batters to a json file."""
-        with open("data/batters.json", "w+", encoding='UTF-8') as file:
-            json.dump([bat.to_dict()for bat in self._batters], file, indent=2)
+        """Export the batters to a json file, or to the database when there is one."""
+        if self._database is not None:
+            self._database.upsert_batters(self._batters)
+            return
+        export_batters(self._batters, mode=self._export_mode)
 
     def _get_teams_json(self, teams_playing: List[str]) -> List[dict]:
-        """Get the teams json file and filter the teams that are playing..
+        """Get the teams directory entries of the teams playing.
 
         Parameters:
-            `teams_playing` (List[str]): The teams playing.
+            `teams_playing` (List[str]): The teams playing, as team codes or as named on the schedule.
 
         Returns:
-            `List[dict]`: The teams playing."""
-        with open("data/teams_directory.json", "r") as file:
-            all_teams: List[dict] = json.load(file)
-
-        final_teams: List[dict] = []
-        for team in all_teams:
-            name = team["team_name"]
-            team_code = team["team_code"]
-            primary_color = team["primary_color"]
-            secondary_color = team["secondary_color"]
-            is_playing = self._check_if_team_is_playing(name, teams_playing)
-            if is_playing:
-                final_teams.append({
-                    "team_code": team_code,
-                    "team_name": name,
-                    "primary_color": primary_color,
-                    "secondary_color": secondary_color,
-                })
+            `List[dict]`: The teams playing, in the order of the teams directory."""
+        final_teams = TeamDirectory.load().select(teams_playing)
         print(f"Found {len(final_teams)} teams")
         return final_teams
-
-    def _check_if_team_is_playing(self, team_name: str, teams_playing: List[str]) -> bool:
-        """Check if the team is playing.
-
-        Parameters:
-            `team_name` (str): The team name.
-            `teams_playing` (List[str]): The teams playing.
-
-        Returns:
-            `True` if the team is playing, `False` if not."""
-        for team in teams_playing:
-            if team_name.find(team) != -1:
-                return True